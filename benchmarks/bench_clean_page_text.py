@@ -0,0 +1,79 @@
+"""Benchmark for boilerplate stripping of raw page content.
+
+Runs clean_page_text over saved pages and reports the token reduction (at ~4 characters per token, as
+used by the source formatter) and throughput. Pass a directory of saved pages (.txt, .md or .html, e.g.
+Tavily raw_content dumped to files) to measure real pages; without one, synthetic pages with typical
+navigation, cookie banners, link lists and footers are used.
+
+Usage:
+    python benchmarks/bench_clean_page_text.py [pages_dir]
+"""
+
+import os
+import sys
+import time
+import random
+
+from open_deep_research.boilerplate import clean_page_text
+
+PAGE_EXTENSIONS = (".txt", ".md", ".markdown", ".html", ".htm")
+
+
+def load_pages(directory):
+    pages = []
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if name.lower().endswith(PAGE_EXTENSIONS):
+                with open(os.path.join(root, name), "r", encoding="utf-8", errors="replace") as file:
+                    pages.append(file.read())
+    return pages
+
+def make_pages(count, seed=0):
+    """ Synthetic markdown pages shaped like Tavily raw_content: chrome around a few paragraphs of article text """
+    rng = random.Random(seed)
+    words = ["model", "attention", "layer", "training", "data", "results", "method", "network", "performance",
+             "learning", "research", "language", "system", "evaluation", "benchmark", "approach", "task"]
+    sections = ["Home", "News", "Sport", "Business", "Technology", "Science", "Health", "Culture", "Opinion"]
+    nav = "\n".join(f"* [{section}](https://example.com/{section.lower()})" for section in sections)
+    chrome_top = f"Skip to main content\n{nav}\nWe use cookies to improve your experience. Accept all cookies\nSign in\n"
+    chrome_bottom = (
+        "\nShare this article\nFollow us on Twitter\n"
+        + "\n".join(f"[{rng.choice(words).title()} {rng.choice(words)} story {i}](https://example.com/related/{i})" for i in range(12))
+        + "\n[Privacy Policy](https://example.com/privacy) | [Terms of Use](https://example.com/terms) | [Contact](https://example.com/contact)"
+        + "\n© 2024 Example Media. All rights reserved.\n"
+    )
+    pages = []
+    for _ in range(count):
+        paragraphs = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(40, 120))).capitalize() + "."
+            for _ in range(rng.randint(4, 12))
+        ]
+        # Many sites repeat the lead paragraph (teaser and body) and the navigation at the bottom
+        body = "\n\n".join([paragraphs[0]] + paragraphs + [f"![figure](https://example.com/img/{rng.randint(0, 99)}.png)"])
+        pages.append(f"{chrome_top}\n# {rng.choice(words).title()} {rng.choice(words)}\n\n{body}\n{nav}{chrome_bottom}")
+    return pages
+
+def main():
+    if len(sys.argv) > 1:
+        pages = load_pages(sys.argv[1])
+        label = f"{len(pages)} saved pages from {sys.argv[1]}"
+    else:
+        pages = make_pages(500)
+        label = f"{len(pages)} synthetic pages"
+    if not pages:
+        sys.exit("No pages found")
+
+    size_mb = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+    start = time.perf_counter()
+    cleaned = [clean_page_text(page) for page in pages]
+    elapsed = time.perf_counter() - start
+
+    tokens_before = sum(len(page) for page in pages) // 4
+    tokens_after = sum(len(page) for page in cleaned) // 4
+    print(label)
+    print(f"  tokens before  {tokens_before:>10,}")
+    print(f"  tokens after   {tokens_after:>10,}   ({1 - tokens_after / tokens_before:.0%} removed)")
+    print(f"  throughput     {size_mb / elapsed:>10.1f} MB/s ({size_mb:.1f} MB in {elapsed * 1000:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Throughput of many report sections researched in parallel, with async nodes versus the previous sync nodes.
+
+Fans out N sections with Send, as the report graph does, each running the section sub-graph
+(generate_queries -> search_web -> write_section). Model calls are simulated with a fixed latency and
+search with a fake backend, so no API keys or network are needed.
+
+  async: the current nodes, awaiting ainvoke, so every section's model calls overlap on one event loop.
+  sync:  the previous design, where generate_queries and write_section were sync nodes calling a
+         blocking invoke, which LangGraph offloads to its thread pool (min(32, cpus + 4) threads).
+
+Usage:
+    python benchmarks/bench_concurrent_sections.py [model_latency_seconds]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import operator
+
+from typing import Annotated, List, TypedDict
+from langchain_core.messages import AIMessage
+from langgraph.constants import Send
+from langgraph.graph import START, END, StateGraph
+
+os.environ.setdefault("SEARCH_CACHE_DISABLED", "true")
+os.environ.setdefault("CONTENT_STORE_DISABLED", "true")
+os.environ.setdefault("PAGE_FETCH_DISABLED", "true")
+
+from open_deep_research import graph as report_graph
+from open_deep_research import utils
+from open_deep_research.token_budget import get_token_counter
+from open_deep_research.state import Section, SectionState, SectionOutputState, Queries, SearchQuery, Feedback, SearchResponse, SearchResult
+
+MODEL_LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+SEARCH_LATENCY = 0.2
+SECTION_COUNTS = [8, 24, 48]
+CONFIG = {"configurable": {"planner_model": "fake-planner", "writer_model": "fake-writer", "search_api": "tavily", "number_of_queries": 2}}
+
+
+class FakeModel:
+    """ Returns a canned response after MODEL_LATENCY, either awaiting or blocking the calling thread """
+
+    def __init__(self, structured_output, blocking):
+        self.structured_output = structured_output
+        self.blocking = blocking
+
+    def response(self):
+        if self.structured_output is Queries:
+            return Queries(queries=[SearchQuery(search_query="fake query 1"), SearchQuery(search_query="fake query 2")])
+        if self.structured_output is Feedback:
+            return Feedback(grade="pass", follow_up_queries=[])
+        return AIMessage(content="Section text. " * 50)
+
+    async def ainvoke(self, messages):
+        if self.blocking:
+            time.sleep(MODEL_LATENCY)
+        else:
+            await asyncio.sleep(MODEL_LATENCY)
+        return self.response()
+
+async def fake_search(search_queries, **kwargs):
+    await asyncio.sleep(SEARCH_LATENCY)
+    def page(query, i):
+        return SearchResult(f"Result {i} for {query}", f"https://example.com/{query}/{i}", f"Snippet {query} {i}",
+                            1.0, " ".join(f"{query}-{i}-{word}" for word in range(400)))
+    return [SearchResponse(query, [page(query, i) for i in range(5)]) for query in search_queries]
+
+def to_sync(node):
+    """ The previous sync version of a node: blocking model calls, run by LangGraph in a worker thread """
+    def sync_node(state, config):
+        return asyncio.run(node(state, config))
+    return sync_node
+
+class FanOutState(TypedDict):
+    sections: List[Section]
+    completed_sections: Annotated[list, operator.add]
+
+def build_graph(sync_nodes):
+    section_builder = StateGraph(SectionState, output=SectionOutputState)
+    section_builder.add_node("generate_queries", to_sync(report_graph.generate_queries) if sync_nodes else report_graph.generate_queries)
+    section_builder.add_node("search_web", report_graph.search_web)
+    section_builder.add_node("write_section", to_sync(report_graph.write_section) if sync_nodes else report_graph.write_section)
+    section_builder.add_edge(START, "generate_queries")
+    section_builder.add_edge("generate_queries", "search_web")
+    section_builder.add_edge("search_web", "write_section")
+
+    builder = StateGraph(FanOutState)
+    builder.add_node("build_section_with_web_research", section_builder.compile())
+    builder.add_conditional_edges(START, lambda state: [
+        Send("build_section_with_web_research", {"topic": "benchmark", "section": section, "search_iterations": 0})
+        for section in state["sections"]
+    ], ["build_section_with_web_research"])
+    builder.add_edge("build_section_with_web_research", END)
+    return builder.compile()
+
+async def run(sync_nodes, num_sections):
+    report_graph.get_chat_model = lambda model, provider, structured_output=None, tools=None, **kwargs: FakeModel(structured_output, sync_nodes)
+    sections = [Section(name=f"Section {i}", description=f"Topic {i}", research=True, content="") for i in range(num_sections)]
+    start = time.perf_counter()
+    result = await build_graph(sync_nodes).ainvoke({"sections": sections, "completed_sections": []}, CONFIG)
+    elapsed = time.perf_counter() - start
+    assert len(result["completed_sections"]) == num_sections
+    return elapsed
+
+def main():
+    utils.SEARCH_BACKENDS["tavily"] = fake_search
+    # Load the writer's tokenizer up front, so neither variant pays for it
+    get_token_counter(CONFIG["configurable"]["writer_model"])
+    ideal = 3 * MODEL_LATENCY + SEARCH_LATENCY
+    print(f"{os.cpu_count()} CPUs, {MODEL_LATENCY}s per model call, 3 model calls and 1 search per section ({ideal:.1f}s per section)")
+    for num_sections in SECTION_COUNTS:
+        sync_elapsed = asyncio.run(run(True, num_sections))
+        async_elapsed = asyncio.run(run(False, num_sections))
+        print(f"{num_sections:3d} sections   sync {sync_elapsed:6.2f}s ({num_sections / sync_elapsed:5.1f} sections/s)   "
+              f"async {async_elapsed:6.2f}s ({num_sections / async_elapsed:5.1f} sections/s)   speedup {sync_elapsed / async_elapsed:4.1f}x")
+
+if __name__ == "__main__":
+    main()
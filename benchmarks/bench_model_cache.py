@@ -0,0 +1,51 @@
+"""Per-call overhead of building chat models with init_chat_model versus the shared model cache.
+
+Every LLM call in the graph used to run init_chat_model and then with_structured_output or bind_tools,
+building a new provider client (and HTTP connection pool) each time. get_chat_model builds each
+configuration once and reuses it. This measures only the construction overhead, including the provider
+client a first request would build, so no request is sent and placeholder API keys are enough. Reused
+connections and TLS sessions also save a handshake per call on top of this.
+
+Usage:
+    python benchmarks/bench_model_cache.py
+"""
+
+import os
+import timeit
+
+from langchain.chat_models import init_chat_model
+from open_deep_research.models import get_chat_model
+from open_deep_research.state import Queries, Feedback
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "placeholder")
+os.environ.setdefault("OPENAI_API_KEY", "placeholder")
+
+CASES = [
+    ("anthropic writer", "claude-3-5-sonnet-latest", "anthropic", {"temperature": 0}, None, None),
+    ("anthropic structured", "claude-3-5-sonnet-latest", "anthropic", {"temperature": 0}, Queries, None),
+    ("anthropic thinking + tools", "claude-3-7-sonnet-latest", "anthropic",
+     {"max_tokens": 20_000, "thinking": {"type": "enabled", "budget_tokens": 16_000}}, None, [Feedback]),
+    ("openai structured", "gpt-4o", "openai", {"temperature": 0}, Queries, None),
+]
+
+
+def build_uncached(model, provider, kwargs, schema, tools):
+    llm = init_chat_model(model=model, model_provider=provider, **kwargs)
+    # ChatAnthropic builds its provider client at the first request rather than in the constructor
+    if provider == "anthropic":
+        llm._client
+    if schema is not None:
+        return llm.with_structured_output(schema)
+    if tools is not None:
+        return llm.bind_tools(tools)
+    return llm
+
+def main():
+    for label, model, provider, kwargs, schema, tools in CASES:
+        uncached = min(timeit.repeat(lambda: build_uncached(model, provider, kwargs, schema, tools), number=20, repeat=5)) / 20
+        get_chat_model(model, provider, structured_output=schema, tools=tools, **kwargs)
+        cached = min(timeit.repeat(lambda: get_chat_model(model, provider, structured_output=schema, tools=tools, **kwargs), number=2000, repeat=5)) / 2000
+        print(f"{label:30s} init_chat_model {uncached * 1000:8.3f} ms   cached {cached * 1000:8.4f} ms   speedup {uncached / cached:8.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Memory benchmark for slotted SearchResult/SearchResponse records versus plain result dicts.
+
+Builds the same 1,000 search results both ways and measures the memory held by the records themselves
+(the title, url, content and raw_content strings are created beforehand and shared, so only container
+overhead is compared). Also shows what a lazily loaded raw_content holds before it is read.
+
+Usage:
+    python benchmarks/bench_search_result_memory.py
+"""
+
+import gc
+import tracemalloc
+
+from open_deep_research.state import SearchResult, SearchResponse
+
+NUM_RESULTS = 1000
+RESULTS_PER_QUERY = 5
+
+
+def make_strings(n):
+    """ Distinct field values, built outside the measured region """
+    return [
+        (f"Title {i}", f"https://example.com/{i}", f"Snippet {i} " * 20, i / n, f"Full page text {i} " * 500)
+        for i in range(n)
+    ]
+
+def build_dicts(strings):
+    responses = []
+    for start in range(0, len(strings), RESULTS_PER_QUERY):
+        results = [
+            {"title": title, "url": url, "content": content, "score": score, "raw_content": raw_content}
+            for title, url, content, score, raw_content in strings[start:start + RESULTS_PER_QUERY]
+        ]
+        responses.append({"query": f"query {start}", "follow_up_questions": None, "answer": None, "images": [], "results": results})
+    return responses
+
+def build_records(strings):
+    responses = []
+    for start in range(0, len(strings), RESULTS_PER_QUERY):
+        results = [
+            SearchResult(title, url, content, score, raw_content)
+            for title, url, content, score, raw_content in strings[start:start + RESULTS_PER_QUERY]
+        ]
+        responses.append(SearchResponse(f"query {start}", results))
+    return responses
+
+def build_lazy_records(strings):
+    responses = []
+    for start in range(0, len(strings), RESULTS_PER_QUERY):
+        results = [
+            SearchResult(title, url, content, score, lambda i=i: f"Full page text {i} " * 500)
+            for i, (title, url, content, score, _) in enumerate(strings[start:start + RESULTS_PER_QUERY], start)
+        ]
+        responses.append(SearchResponse(f"query {start}", results))
+    return responses
+
+def measure(build, strings):
+    """ Bytes allocated by build(strings) that are still alive when it returns """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    responses = build(strings)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del responses
+    return after - before
+
+def main():
+    strings = make_strings(NUM_RESULTS)
+    dicts = measure(build_dicts, strings)
+    records = measure(build_records, strings)
+    print(f"Per {NUM_RESULTS:,} results ({RESULTS_PER_QUERY} per query), excluding shared field strings:")
+    print(f"  dicts                {dicts / 1024:8.1f} KiB")
+    print(f"  slotted records      {records / 1024:8.1f} KiB   saved {(dicts - records) / 1024:.1f} KiB ({1 - records / dicts:.0%})")
+
+    # A lazy raw_content holds a loader instead of the text, so the full text itself is not alive yet
+    raw_bytes = sum(len(raw_content) for *_, raw_content in strings)
+    lazy = measure(build_lazy_records, strings)
+    print(f"  lazy raw_content     {lazy / 1024:8.1f} KiB   (eager records also hold {raw_bytes / 1024:,.0f} KiB of raw_content text)")
+
+if __name__ == "__main__":
+    main()
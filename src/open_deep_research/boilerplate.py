@@ -0,0 +1,122 @@
+import re
+import html
+
+# Markup that is replaced before lines are looked at
+HTML_DROP_PATTERN = re.compile(r"<(script|style|noscript|nav|footer|aside|form)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+HTML_BLOCK_TAG_PATTERN = re.compile(r"</?(?:p|div|br|li|ul|ol|h[1-6]|tr|table|section|article|header|main|blockquote|pre|hr)\b[^>]{0,500}>", re.IGNORECASE)
+HTML_TAG_PATTERN = re.compile(r"</?[a-zA-Z][^<>]{0,500}>")
+MARKDOWN_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\((?:[^()]|\([^)]*\))*\)")
+SPACE_PATTERN = re.compile(r"[ \t\f\v ]+")
+
+# Short lines that are site chrome (cookie banners, navigation, sharing, footers), not content. Most
+# phrases must make up the whole line (apart from trailing punctuation), so prose that merely mentions
+# cookies, consent or a newsletter is kept; the rest only match at the start of a line.
+BOILERPLATE_LINE_PATTERN = re.compile(
+    r"^(?:(?:accept|reject|allow|decline|manage) (?:all |optional )?cookies|cookie (?:settings|preferences|policy|notice)"
+    r"|manage (?:consent|preferences)|privacy (?:policy|settings|preferences)|terms (?:of|and) (?:use|service|conditions)"
+    r"|skip to (?:main )?(?:content|navigation)|(?:main )?(?:menu|navigation)|home|search|close|back to top|top"
+    r"|(?:sign|log) ?(?:in|up|out)|register|subscribe(?: now)?|follow us(?: on \w+)?|share|share (?:this(?: \w+)?|on \w+)"
+    r"|tweet|pin it|email|advertisement|sponsored|related (?:articles|posts|stories)|(?:read|see) (?:more|also)"
+    r"|(?:previous|next)(?: (?:article|post|page))?)\W*$"
+    r"|^(?:(?:this (?:web)?site|we) uses? cookies|by (?:continuing|using) (?:to use )?this (?:web)?site"
+    r"|(?:©|copyright ©?|\(c\)) ?\d{4}|sign up for (?:our|the) newsletter|subscribe to (?:our|the) newsletter"
+    r"|(?:please )?enable javascript|javascript is (?:disabled|required)|your browser (?:does not|doesn't) support)\b"
+    r"|\ball rights reserved\W*$",
+    re.IGNORECASE,
+)
+# Lines longer than this are treated as prose even if they match a boilerplate pattern
+MAX_BOILERPLATE_LINE_CHARS = 120
+
+# A run of at least this many consecutive link-only lines, or very short plain lines, is treated as a menu or link list
+LINK_RUN_MIN_LINES = 4
+LINK_LINE_MAX_CHARS = 80
+MENU_LINE_MAX_WORDS = 3
+SENTENCE_END_PATTERN = re.compile(r"[.!?:;]\W*$")
+LIST_MARKER_PATTERN = re.compile(r"^([-*+•]|\d+[.)])\s")
+URL_LINE_PATTERN = re.compile(r"^(https?://|www\.)\S+$")
+# A single line made only of at least this many links is a navigation bar
+INLINE_MENU_MIN_LINKS = 3
+# What is left of a line of links once the links are removed: bullets, separators and numbering
+LINK_SEPARATORS = " \t-*+•|·>/,.0123456789"
+
+# Repeats of lines at least this long are dropped; shorter ones (e.g. table cells) may legitimately repeat
+MIN_DEDUP_LINE_CHARS = 20
+
+
+def _is_link_line(line: str, links_only: bool) -> bool:
+    """
+    Whether a line looks like an entry of a menu or link list: a line made only of links, or a plain line of
+    a few words without sentence punctuation. Headings and list items with text of their own are not.
+    """
+    if len(line) > LINK_LINE_MAX_CHARS or line.startswith("#"):
+        return False
+    if links_only:
+        return True
+    return len(line.split()) <= MENU_LINE_MAX_WORDS and not LIST_MARKER_PATTERN.match(line) and not SENTENCE_END_PATTERN.search(line)
+
+def clean_page_text(text: str) -> str:
+    """
+    Strips boilerplate and markup from page text.
+
+    Removes HTML tags, markdown images and link targets, site chrome such as cookie banners, navigation,
+    sharing widgets and footers, runs of short link-list lines and lines that repeat earlier ones, then
+    collapses whitespace. Works in a single pass over the lines of the document.
+
+    Args:
+        text (str): Raw page text, plain, markdown or HTML.
+
+    Returns:
+        str: The cleaned text, with paragraphs separated by a blank line.
+    """
+    if "<" in text:
+        text = HTML_BLOCK_TAG_PATTERN.sub("\n", HTML_DROP_PATTERN.sub("\n", text))
+        text = html.unescape(HTML_TAG_PATTERN.sub("", text))
+
+    kept = []
+    seen = set()
+    link_run = []
+    paragraph_break = False
+
+    def emit(line, after_break):
+        if after_break and kept and kept[-1]:
+            kept.append("")
+        kept.append(line)
+
+    def flush_link_run():
+        # A few short lines in a row (e.g. list items) are kept, a long run is a menu or link list
+        if len(link_run) < LINK_RUN_MIN_LINES:
+            for line, after_break in link_run:
+                emit(line, after_break)
+        elif kept and kept[-1]:
+            kept.append("")
+        link_run.clear()
+
+    for line in text.splitlines():
+        links_only = False
+        if "](" in line:
+            line = MARKDOWN_IMAGE_PATTERN.sub("", line)
+            links_only = not MARKDOWN_LINK_PATTERN.sub("", line).strip(LINK_SEPARATORS)
+            line, link_count = MARKDOWN_LINK_PATTERN.subn(r"\1", line)
+            if links_only and link_count >= INLINE_MENU_MIN_LINKS:
+                continue
+        line = SPACE_PATTERN.sub(" ", line).strip()
+        if not line:
+            paragraph_break = True
+            continue
+        if len(line) <= MAX_BOILERPLATE_LINE_CHARS and (BOILERPLATE_LINE_PATTERN.search(line) or URL_LINE_PATTERN.match(line)):
+            continue
+        if len(line) >= MIN_DEDUP_LINE_CHARS:
+            if line in seen:
+                continue
+            seen.add(line)
+
+        if _is_link_line(line, links_only):
+            link_run.append((line, paragraph_break))
+        else:
+            flush_link_run()
+            emit(line, paragraph_break)
+        paragraph_break = False
+    flush_link_run()
+
+    return "\n".join(kept).strip()
@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from langgraph.config import get_config
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "open_deep_research")
+
+# How long (in seconds) a cached search response stays fresh for each provider.
+# Web results go stale quickly, while arXiv and PubMed records rarely change.
+DEFAULT_SEARCH_TTLS = {
+    "tavily": 6 * 60 * 60,
+    "exa": 6 * 60 * 60,
+    "perplexity": 60 * 60,
+    "arxiv": 7 * 24 * 60 * 60,
+    "pubmed": 7 * 24 * 60 * 60,
+}
+DEFAULT_SEARCH_TTL = 60 * 60
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def get_cache_dir() -> str:
+    """
+    Returns the directory used for on-disk caches, creating it if needed.
+    Can be overridden with the ODR_CACHE_DIR environment variable.
+    """
+    cache_dir = os.environ.get("ODR_CACHE_DIR", DEFAULT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def normalize_query(query: str) -> str:
+    """ Normalize a search query so trivially different spellings share a cache entry """
+    return " ".join(str(query).lower().split())
+
+def make_search_key(provider: str, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds a stable key for a single search request.
+
+    Args:
+        provider (str): The search API identifier (e.g., "exa", "tavily").
+        query (str): The search query.
+        params (Dict[str, Any], optional): The filtered parameters passed to the search function.
+
+    Returns:
+        str: A hex digest identifying the (provider, normalized query, params) triple.
+    """
+    payload = json.dumps([provider, normalize_query(query), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    SQLite-backed cache of per-query search responses.
+
+    Entries expire after a per-provider TTL and the table is kept below max_entries
+    by evicting the least recently used rows. The database runs in WAL mode so
+    several processes can share one cache file.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, ttls: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_SEARCH_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS search_cache (
+                       key TEXT PRIMARY KEY,
+                       provider TEXT NOT NULL,
+                       response TEXT NOT NULL,
+                       expires_at REAL NOT NULL,
+                       last_accessed REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_lru ON search_cache(last_accessed)")
+
+    def get_ttl(self, provider: str) -> int:
+        """ Get the TTL in seconds for a provider """
+        return self.ttls.get(provider, DEFAULT_SEARCH_TTL)
+
+    def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        Looks up several keys at once.
+
+        Args:
+            keys (List[str]): Keys built with make_search_key.
+
+        Returns:
+            Dict[str, dict]: The fresh cached responses, keyed by cache key. Missing and expired keys are omitted.
+        """
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT key, response, expires_at FROM search_cache WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+            hits = {key: response for key, response, expires_at in rows if expires_at > now}
+            expired = [key for key, _, expires_at in rows if expires_at <= now]
+            if hits:
+                self._conn.executemany(
+                    "UPDATE search_cache SET last_accessed = ? WHERE key = ?",
+                    [(now, key) for key in hits],
+                )
+            if expired:
+                self._conn.executemany("DELETE FROM search_cache WHERE key = ?", [(key,) for key in expired])
+        return {key: json.loads(response) for key, response in hits.items()}
+
+    def set_many(self, provider: str, responses: Dict[str, dict]) -> None:
+        """
+        Stores several responses for one provider and evicts the least recently used rows if over capacity.
+
+        Args:
+            provider (str): The search API identifier, used to pick the TTL.
+            responses (Dict[str, dict]): Search responses keyed by cache key.
+        """
+        ttl = self.get_ttl(provider)
+        if not responses or ttl <= 0:
+            return
+        now = time.time()
+        rows = [(key, provider, json.dumps(response, default=str), now + ttl, now) for key, response in responses.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)", rows)
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN "
+                    "(SELECT key FROM search_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def clear(self, provider: Optional[str] = None) -> None:
+        """ Remove all entries, or only the entries of one provider """
+        with self._lock, self._conn:
+            if provider is None:
+                self._conn.execute("DELETE FROM search_cache")
+            else:
+                self._conn.execute("DELETE FROM search_cache WHERE provider = ?", (provider,))
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Returns the process-wide search cache, creating it on first use.
+
+    Configured through environment variables:
+        SEARCH_CACHE_DISABLED: Set to "true" to bypass the cache entirely.
+        SEARCH_CACHE_PATH: Location of the SQLite file. Defaults to search_cache.sqlite in the cache dir.
+        SEARCH_CACHE_MAX_ENTRIES: Maximum number of cached query responses.
+        SEARCH_CACHE_TTL_<PROVIDER>: TTL in seconds for one provider, e.g. SEARCH_CACHE_TTL_TAVILY=600.
+            A TTL of 0 disables caching for that provider.
+
+    Returns:
+        Optional[SearchCache]: The shared cache, or None if caching is disabled.
+    """
+    global _search_cache
+    if os.environ.get("SEARCH_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                ttls = {
+                    provider: int(os.environ[f"SEARCH_CACHE_TTL_{provider.upper()}"])
+                    for provider in DEFAULT_SEARCH_TTLS
+                    if f"SEARCH_CACHE_TTL_{provider.upper()}" in os.environ
+                }
+                _search_cache = SearchCache(
+                    path=os.environ.get("SEARCH_CACHE_PATH") or os.path.join(get_cache_dir(), "search_cache.sqlite"),
+                    max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                    ttls=ttls,
+                )
+    return _search_cache
+
+
+def get_run_id() -> str:
+    """ Identify the current report run by its LangGraph thread_id, falling back to "default" outside a graph """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return "default"
+    return str(config.get("configurable", {}).get("thread_id") or "default")
+
+
+class _Flight:
+    """ One in-flight fetch and the number of callers waiting on it """
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical search requests.
+
+    While a request for a key is in flight, any other caller asking for the same key on the same event loop
+    awaits the existing fetch instead of issuing a duplicate API call. The fetch is shielded from any single
+    caller's cancellation and only cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[tuple, _Flight] = {}
+        self._requested = Counter()
+        self._coalesced = Counter()
+        self._lock = threading.Lock()
+
+    async def run(self, provider: str, missing: Dict[str, str], fetch: Callable[[Dict[str, str]], Awaitable[Dict[str, dict]]]) -> Dict[str, dict]:
+        """
+        Fetches the given keys, joining in-flight fetches where possible.
+
+        Args:
+            provider (str): The search API identifier, used for the counters.
+            missing (Dict[str, str]): Queries to fetch, keyed by cache key.
+            fetch: Coroutine function that takes {key: query} and returns {key: response}.
+
+        Returns:
+            Dict[str, dict]: Responses keyed by cache key.
+        """
+        loop = asyncio.get_running_loop()
+        flights = {}
+        owned = {}
+        for key, query in missing.items():
+            flight = self._flights.get((loop, key))
+            if flight is None:
+                owned[key] = query
+            else:
+                flights[id(flight)] = flight
+
+        if owned:
+            flight = _Flight(asyncio.ensure_future(fetch(owned)))
+            for key in owned:
+                self._flights[(loop, key)] = flight
+            flight.task.add_done_callback(lambda _, flight=flight, keys=list(owned): self._forget(loop, keys, flight))
+            flights[id(flight)] = flight
+
+        run_id = get_run_id()
+        with self._lock:
+            self._requested[(run_id, provider)] += len(missing)
+            self._coalesced[(run_id, provider)] += len(missing) - len(owned)
+
+        for flight in flights.values():
+            flight.waiters += 1
+        try:
+            responses = {}
+            for flight in flights.values():
+                responses.update(await asyncio.shield(flight.task))
+        finally:
+            for flight in flights.values():
+                flight.waiters -= 1
+                if flight.waiters == 0 and not flight.task.done():
+                    flight.task.cancel()
+        return {key: responses[key] for key in missing}
+
+    def _forget(self, loop, keys: List[str], flight: _Flight) -> None:
+        """ Drop a finished flight, unless a newer flight has already taken its keys """
+        for key in keys:
+            if self._flights.get((loop, key)) is flight:
+                del self._flights[(loop, key)]
+
+    def stats(self, run_id: Optional[str] = None, clear: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Counters of coalesced requests.
+
+        Counters are kept per run until they are cleared, so long-lived servers should read each run's
+        stats with clear=True once the run is done.
+
+        Args:
+            run_id (str, optional): Restrict to one run (LangGraph thread_id). Defaults to all runs combined.
+            clear (bool): Forget the counters that were returned, i.e. those of run_id, or of every run.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Per provider, the number of queries that needed a fetch ('requested')
+            and how many of them joined an in-flight call instead of making their own ('saved').
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            keys = [key for key in self._requested if run_id is None or key[0] == run_id]
+            for run, provider in keys:
+                provider_stats = stats.setdefault(provider, {"requested": 0, "saved": 0})
+                provider_stats["requested"] += self._requested[(run, provider)]
+                provider_stats["saved"] += self._coalesced[(run, provider)]
+                if clear:
+                    del self._requested[(run, provider)]
+                    self._coalesced.pop((run, provider), None)
+        return stats
+
+
+search_flight = SingleFlight()
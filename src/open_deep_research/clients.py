@@ -0,0 +1,102 @@
+import os
+import asyncio
+import threading
+import weakref
+
+import arxiv
+import httpx
+
+from tavily import AsyncTavilyClient
+from exa_py import Exa
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ClientRegistry:
+    """
+    Lazily creates provider clients on first use and shares them across nodes and runs.
+
+    Clients are keyed by a hashable key that includes every constructor argument (and the API key),
+    so a change in configuration gets a new client while identical configurations share one.
+    Async HTTP clients hold connections bound to the event loop that created them, so they are
+    shared per running loop and dropped automatically when that loop is garbage collected.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Hashable, Any] = {}
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """ Get the client for key, calling factory to build it the first time """
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    def get_for_loop(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """ Get the client for key on the running event loop, calling factory to build it the first time """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._loop_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or getattr(client, "is_closed", False):
+                client = factory()
+                clients[key] = client
+        return client
+
+    def clear(self) -> None:
+        """ Forget all clients so the next call builds fresh ones """
+        with self._lock:
+            self._clients.clear()
+            self._loop_clients = weakref.WeakKeyDictionary()
+
+
+client_registry = ClientRegistry()
+
+
+def get_tavily_async_client(api_key: Optional[str] = None):
+    """ Shared async Tavily client for an API key (by default TAVILY_API_KEY) on the running event loop, reusing its keep-alive connections """
+    api_key = api_key or os.getenv("TAVILY_API_KEY")
+    return client_registry.get_for_loop(("tavily_async", api_key), lambda: AsyncTavilyClient(api_key=api_key))
+
+def get_exa_client(api_key: Optional[str] = None):
+    """ Shared Exa client for an API key, by default EXA_API_KEY (should be configured in your .env file) """
+    api_key = api_key or os.getenv("EXA_API_KEY")
+    return client_registry.get(("exa", api_key), lambda: Exa(api_key=f"{api_key}"))
+
+def get_perplexity_client() -> httpx.AsyncClient:
+    """ Keep-alive HTTP client for the Perplexity API, shared by all calls on the running event loop """
+    return client_registry.get_for_loop(
+        ("perplexity",),
+        lambda: httpx.AsyncClient(
+            base_url="https://api.perplexity.ai",
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        ),
+    )
+
+def get_arxiv_client() -> arxiv.Client:
+    """ Shared arXiv API client. Request spacing and retries are left to the shared search scheduler and resilience layer. """
+    return client_registry.get(("arxiv",), lambda: arxiv.Client(delay_seconds=0.0, num_retries=0))
+
+def get_arxiv_http_client() -> httpx.AsyncClient:
+    """ Keep-alive HTTP client for downloading arXiv PDFs, shared by all calls on the running event loop """
+    return client_registry.get_for_loop(
+        ("arxiv_http",),
+        lambda: httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        ),
+    )
+
+def get_pubmed_client() -> httpx.AsyncClient:
+    """ Keep-alive HTTP client for NCBI E-utilities, shared by all calls on the running event loop """
+    return client_registry.get_for_loop(
+        ("pubmed",),
+        lambda: httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0)),
+    )
@@ -1,7 +1,7 @@
 import os
 from enum import Enum
 from dataclasses import dataclass, fields
-from typing import Any, Optional, Dict 
+from typing import Any, Optional, Dict, List, Union, get_args, get_origin
 
 from langchain_core.runnables import RunnableConfig
 from dataclasses import dataclass
@@ -24,6 +24,7 @@ class SearchAPI(Enum):
     EXA = "exa"
     ARXIV = "arxiv"
     PUBMED = "pubmed"
+    LOCAL = "local"
 
 class PlannerProvider(Enum):
     ANTHROPIC = "anthropic"
@@ -47,6 +48,14 @@ class Configuration:
     writer_model: str = "claude-3-5-sonnet-latest" # Defaults to claude-3-5-sonnet-latest
     search_api: SearchAPI = SearchAPI.TAVILY # Default to TAVILY
     search_api_config: Optional[Dict[str, Any]] = None 
+    search_api_hedge: Optional[List[SearchAPI]] = None # Fallback search APIs, in order, to hedge slow queries against
+    hedge_delay_percentile: float = 0.95 # Latency percentile of a search API to wait for before hedging
+    search_enough_sources: Optional[int] = None # Stop waiting for slower queries once this many distinct sources have arrived; None waits for all queries
+    search_enough_tokens: Optional[int] = None # Stop waiting for slower queries once this many tokens of sources have arrived; None waits for all queries
+    max_section_source_tokens: int = 50_000 # Total source tokens a section may send to the writer, shared evenly across its search iterations
+    near_duplicate_threshold: float = 0.8 # Estimated text similarity (0-1) at which two sources count as copies of each other
+    source_token_budget: Optional[int] = 20_000 # Total tokens of sources per writer call, split by relevance; None uses a fixed per-source cap instead
+    rerank_top_k: Optional[int] = 10 # Sources kept per search iteration, ranked by relevance to the section; None keeps all of them
 
     @classmethod
     def from_runnable_config(
@@ -56,9 +65,19 @@ class Configuration:
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
-            for f in fields(cls)
-            if f.init
-        }
-        return cls(**{k: v for k, v in values.items() if v})
\ No newline at end of file
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            value = os.environ.get(f.name.upper(), configurable.get(f.name))
+            if value is not None and value != "":
+                values[f.name] = value
+            elif f.name in configurable and configurable[f.name] is None and _is_optional(f.type):
+                # An explicit None turns off optional settings that default to on, e.g. source_token_budget
+                values[f.name] = None
+        return cls(**values)
+
+
+def _is_optional(field_type: Any) -> bool:
+    """Whether a field's type annotation accepts None."""
+    return get_origin(field_type) is Union and type(None) in get_args(field_type)
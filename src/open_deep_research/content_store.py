@@ -0,0 +1,177 @@
+import os
+import re
+import time
+import sqlite3
+import functools
+import threading
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from open_deep_research.cache import get_cache_dir
+
+# How long (in seconds) stored page text is used before it must be revalidated by a fresh fetch
+DEFAULT_CONTENT_TTL = 24 * 60 * 60
+# Total size of stored page text before the least recently used pages are evicted
+DEFAULT_CONTENT_MAX_BYTES = 512 * 1024 * 1024
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that only track where a click came from and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi", "ref", "ref_src", "ref_url"}
+
+# arXiv abstract and PDF links, with or without a version or .pdf suffix, e.g. /pdf/2107.05580v2.pdf
+ARXIV_PATH_PATTERN = re.compile(r"^/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?$")
+
+
+# Memoized, since every source URL is canonicalized several times on its way to the writer
+@functools.lru_cache(maxsize=8192)
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so different spellings of the same page share one key.
+
+    http and https are treated alike, and the host is lowercased without "www." or a default port.
+    The fragment, a trailing slash and tracking parameters (utm_*, fbclid, ...) are dropped and the
+    remaining query parameters are sorted. arXiv abstract and PDF links of any version map to the abstract page.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if scheme in DEFAULT_PORTS:
+        scheme = "https"
+        host = host[4:] if host.startswith("www.") else host
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+
+    if host in ("arxiv.org", "export.arxiv.org"):
+        match = ARXIV_PATH_PATTERN.match(parts.path)
+        if match:
+            return f"https://arxiv.org/abs/{match.group(1)}"
+
+    path = parts.path.rstrip("/") if parts.path not in ("", "/") else ""
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(params)), ""))
+
+
+class ContentStore:
+    """
+    SQLite-backed store of page text keyed by canonical URL.
+
+    Shared by every search backend, so a page returned by different queries, providers or runs is
+    stored once. Entries older than the TTL are not served, and are replaced the next time a backend
+    fetches the page. The table is kept below max_bytes of text by evicting the least recently used
+    pages. The database runs in WAL mode so several processes can share one store.
+    """
+
+    def __init__(self, path: str, ttl: int = DEFAULT_CONTENT_TTL, max_bytes: int = DEFAULT_CONTENT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS page_content (
+                       url TEXT PRIMARY KEY,
+                       title TEXT NOT NULL,
+                       text TEXT NOT NULL,
+                       size INTEGER NOT NULL,
+                       fetched_at REAL NOT NULL,
+                       last_accessed REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_page_content_lru ON page_content(last_accessed)")
+
+    def get_many(self, urls: List[str]) -> Dict[str, dict]:
+        """
+        Looks up several pages at once.
+
+        Args:
+            urls (List[str]): Page URLs, canonicalized before lookup.
+
+        Returns:
+            Dict[str, dict]: 'title', 'text' and 'fetched_at' of each fresh page, keyed by canonical URL.
+        """
+        keys = list(dict.fromkeys(canonicalize_url(url) for url in urls))
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT url, title, text, fetched_at FROM page_content WHERE url IN ({placeholders}) AND fetched_at > ?",
+                keys + [now - self.ttl],
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE page_content SET last_accessed = ? WHERE url = ?",
+                    [(now, url) for url, *_ in rows],
+                )
+        return {url: {"title": title, "text": text, "fetched_at": fetched_at} for url, title, text, fetched_at in rows}
+
+    def set_many(self, pages: Dict[str, Tuple[str, str]]) -> None:
+        """
+        Stores freshly fetched pages and evicts the least recently used pages if over capacity.
+
+        Args:
+            pages (Dict[str, Tuple[str, str]]): (title, text) keyed by page URL.
+        """
+        if not pages or self.ttl <= 0:
+            return
+        now = time.time()
+        rows = {}
+        for url, (title, text) in pages.items():
+            rows[canonicalize_url(url)] = (title or "", text, len(text.encode("utf-8")), now, now)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO page_content VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, *row) for url, row in rows.items()],
+            )
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_content").fetchone()
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                evict = []
+                for url, size in self._conn.execute("SELECT url, size FROM page_content ORDER BY last_accessed ASC"):
+                    evict.append((url,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._conn.executemany("DELETE FROM page_content WHERE url = ?", evict)
+
+    def clear(self) -> None:
+        """ Remove all pages """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM page_content")
+
+
+_content_store: Optional[ContentStore] = None
+_content_store_lock = threading.Lock()
+
+def get_content_store() -> Optional[ContentStore]:
+    """
+    Returns the process-wide page content store, creating it on first use.
+
+    Configured through environment variables:
+        CONTENT_STORE_DISABLED: Set to "true" to bypass the store entirely.
+        CONTENT_STORE_PATH: Location of the SQLite file. Defaults to content_store.sqlite in the cache dir.
+        CONTENT_STORE_TTL: Seconds before stored page text must be refetched. 0 disables storing.
+        CONTENT_STORE_MAX_BYTES: Maximum total size of stored page text.
+
+    Returns:
+        Optional[ContentStore]: The shared store, or None if it is disabled.
+    """
+    global _content_store
+    if os.environ.get("CONTENT_STORE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _content_store is None:
+        with _content_store_lock:
+            if _content_store is None:
+                _content_store = ContentStore(
+                    path=os.environ.get("CONTENT_STORE_PATH") or os.path.join(get_cache_dir(), "content_store.sqlite"),
+                    ttl=int(os.environ.get("CONTENT_STORE_TTL", DEFAULT_CONTENT_TTL)),
+                    max_bytes=int(os.environ.get("CONTENT_STORE_MAX_BYTES", DEFAULT_CONTENT_MAX_BYTES)),
+                )
+    return _content_store
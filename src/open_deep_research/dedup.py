@@ -0,0 +1,99 @@
+import re
+
+import numpy as np
+
+from typing import List, Optional
+
+# Number of MinHash permutations. The Jaccard similarity estimate has a standard error of about 1/sqrt(NUM_PERM).
+NUM_PERM = 64
+# Documents are compared as sets of overlapping word n-grams of this length
+SHINGLE_SIZE = 5
+# Only the first words of a document are shingled; syndicated copies already agree on their opening text
+MAX_SHINGLE_WORDS = 2000
+# Permutations hashed per step, which bounds the temporary array at PERM_CHUNK x total shingles
+PERM_CHUNK = 16
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Multiply-shift hash functions with fixed seeds, so signatures are comparable across calls
+_rng = np.random.default_rng(20240229)
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_SHINGLE_PRIME = np.uint64(1099511628211)
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """ 64-bit hashes of the word n-grams of a text, or an empty array if it has fewer than SHINGLE_SIZE words """
+    words = WORD_PATTERN.findall(text.lower())[:MAX_SHINGLE_WORDS]
+    count = len(words) - SHINGLE_SIZE + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    word_hashes = np.fromiter((hash(word) for word in words), dtype=np.int64, count=len(words)).view(np.uint64)
+    shingles = word_hashes[:count].copy()
+    for offset in range(1, SHINGLE_SIZE):
+        shingles = shingles * _SHINGLE_PRIME + word_hashes[offset:offset + count]
+    return shingles
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """
+    Computes MinHash signatures for a batch of texts.
+
+    The shingles of all texts are hashed together, so each permutation is one vectorized pass over the
+    whole batch, and per-text minimums are taken with a single reduceat.
+
+    Args:
+        texts (List[str]): Texts with at least SHINGLE_SIZE words each.
+
+    Returns:
+        np.ndarray: Array of shape (len(texts), NUM_PERM).
+    """
+    return _signatures([shingle_hashes(text) for text in texts])
+
+def _signatures(per_text: List[np.ndarray]) -> np.ndarray:
+    """ MinHash signatures from each text's shingle hashes """
+    lengths = np.array([len(shingles) for shingles in per_text])
+    if (lengths == 0).any():
+        raise ValueError("Every text needs at least SHINGLE_SIZE words")
+    shingles = np.concatenate(per_text)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    signatures = np.empty((len(per_text), NUM_PERM), dtype=np.uint64)
+    for start in range(0, NUM_PERM, PERM_CHUNK):
+        a = _PERM_A[start:start + PERM_CHUNK, None]
+        b = _PERM_B[start:start + PERM_CHUNK, None]
+        hashed = (a * shingles[None, :] + b) >> np.uint64(32)
+        signatures[:, start:start + PERM_CHUNK] = np.minimum.reduceat(hashed, offsets, axis=1).T
+    return signatures
+
+def find_near_duplicates(texts: List[Optional[str]], threshold: float = 0.8) -> List[Optional[int]]:
+    """
+    Finds texts that are near-duplicates of an earlier text in the list.
+
+    Args:
+        texts (List[Optional[str]]): Texts in priority order. Texts that are None or too short are never matched.
+        threshold (float): Estimated Jaccard similarity of word n-grams at which two texts count as duplicates.
+
+    Returns:
+        List[Optional[int]]: For each text, the index of the earlier, kept text it duplicates, or None.
+    """
+    duplicate_of: List[Optional[int]] = [None] * len(texts)
+    candidates = []
+    per_text = []
+    for i, text in enumerate(texts):
+        shingles = shingle_hashes(text) if text else None
+        if shingles is not None and len(shingles):
+            candidates.append(i)
+            per_text.append(shingles)
+    if len(candidates) < 2:
+        return duplicate_of
+
+    signatures = _signatures(per_text)
+    # Share of matching signature slots estimates the Jaccard similarity of every pair at once
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+    for row in range(1, len(candidates)):
+        earlier = np.flatnonzero(similarity[row, :row] >= threshold)
+        if len(earlier):
+            # Point at the kept text of the group, so chains of duplicates collapse into one source
+            match = candidates[earlier[0]]
+            duplicate_of[candidates[row]] = duplicate_of[match] if duplicate_of[match] is not None else match
+    return duplicate_of
@@ -1,7 +1,8 @@
+import asyncio
+
 from typing import Literal
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain.chat_models import init_chat_model
 from langchain_core.runnables import RunnableConfig
 
 from langgraph.constants import Send
@@ -11,7 +12,8 @@ from langgraph.types import interrupt, Command
 from open_deep_research.state import ReportStateInput, ReportStateOutput, Sections, ReportState, SectionState, SectionOutputState, Queries, Feedback
 from open_deep_research.prompts import report_planner_query_writer_instructions, report_planner_instructions, query_writer_instructions, section_writer_instructions, final_section_writer_instructions, section_grader_instructions
 from open_deep_research.configuration import Configuration
-from open_deep_research.utils import tavily_search_async, exa_search, arxiv_search_async, pubmed_search_async, deduplicate_and_format_sources, format_sections, perplexity_search, get_config_value, get_search_params
+from open_deep_research.models import get_chat_model
+from open_deep_research.utils import hedged_search, collect_search_results, deduplicate_and_format_sources, format_sources_within_budget, collapse_duplicate_sources, rerank_sources, drop_seen_sources, iteration_token_budget, select_new_sources, record_sent_sources, format_cited_sources, format_sections, get_config_value, get_search_apis, ainvoke_with_key_pool
 
 # Nodes
 async def generate_report_plan(state: ReportState, config: RunnableConfig):
@@ -25,9 +27,8 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     configurable = Configuration.from_runnable_config(config)
     report_structure = configurable.report_structure
     number_of_queries = configurable.number_of_queries
-    search_api = get_config_value(configurable.search_api)
+    search_apis = get_search_apis(configurable.search_api, configurable.search_api_hedge)  # Primary search API first, then hedges
     search_api_config = configurable.search_api_config or {}  # Get the config dict, default to empty
-    params_to_pass = get_search_params(search_api, search_api_config)  # Filter parameters
 
     # Convert JSON object to string if necessary
     if isinstance(report_structure, dict):
@@ -36,37 +37,24 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     # Set writer model (model used for query writing and section writing)
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, temperature=0) 
-    structured_llm = writer_model.with_structured_output(Queries)
+    # Models are looked up per call, so each call can use another of the provider's API keys
+    def structured_llm(**api_key):
+        return get_chat_model(writer_model_name, writer_provider, structured_output=Queries, temperature=0, **api_key)
 
     # Format system instructions
     system_instructions_query = report_planner_query_writer_instructions.format(topic=topic, report_organization=report_structure, number_of_queries=number_of_queries)
 
     # Generate queries  
-    results = structured_llm.invoke([SystemMessage(content=system_instructions_query),
-                                     HumanMessage(content="Generate search queries that will help with planning the sections of the report.")])
+    results = await ainvoke_with_key_pool(writer_provider, structured_llm,
+                                   [SystemMessage(content=system_instructions_query),
+                                    HumanMessage(content="Generate search queries that will help with planning the sections of the report.")])
 
     # Web search
     query_list = [query.search_query for query in results.queries]
 
-    # Search the web with parameters
-    if search_api == "tavily":
-        search_results = await tavily_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "perplexity":
-        search_results = perplexity_search(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "exa":
-        search_results = await exa_search(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "arxiv":
-        search_results = await arxiv_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "pubmed":
-        search_results = await pubmed_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    else:
-        raise ValueError(f"Unsupported search API: {search_api}")
+    # Search the web with parameters, hedging slow queries if fallback search APIs are configured
+    search_results = await hedged_search(search_apis, query_list, search_api_config, float(configurable.hedge_delay_percentile))
+    source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
 
     # Format system instructions
     system_instructions_sections = report_planner_instructions.format(topic=topic, report_organization=report_structure, context=source_str, feedback=feedback)
@@ -83,31 +71,38 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     if planner_model == "claude-3-7-sonnet-latest":
 
         # Allocate a thinking budget for claude-3-7-sonnet-latest as the planner model
-        planner_llm = init_chat_model(model=planner_model, 
-                                      model_provider=planner_provider, 
-                                      max_tokens=20_000, 
-                                      thinking={"type": "enabled", "budget_tokens": 16_000})
-        
         # with_structured_output uses forced tool calling, which thinking mode with Claude 3.7 does not support
         # So, we use bind_tools without enforcing tool calling to generate the report sections
-        report_sections = planner_llm.bind_tools([Sections]).invoke([SystemMessage(content=system_instructions_sections),
-                                                                     HumanMessage(content=planner_message)])
+        def planner_llm(**api_key):
+            return get_chat_model(planner_model, 
+                                  planner_provider, 
+                                  tools=[Sections],
+                                  max_tokens=20_000, 
+                                  thinking={"type": "enabled", "budget_tokens": 16_000},
+                                  **api_key)
+        
+        report_sections = await ainvoke_with_key_pool(planner_provider, planner_llm,
+                                               [SystemMessage(content=system_instructions_sections),
+                                                HumanMessage(content=planner_message)])
         tool_call = report_sections.tool_calls[0]['args']
         report_sections = Sections.model_validate(tool_call)
 
     else:
 
         # With other models, we can use with_structured_output
-        planner_llm = init_chat_model(model=planner_model, model_provider=planner_provider)
-        structured_llm = planner_llm.with_structured_output(Sections)
-        report_sections = structured_llm.invoke([SystemMessage(content=system_instructions_sections),
-                                                 HumanMessage(content=planner_message)])
+        def structured_llm(**api_key):
+            return get_chat_model(planner_model, planner_provider, structured_output=Sections, **api_key)
+        report_sections = await ainvoke_with_key_pool(planner_provider, structured_llm,
+                                               [SystemMessage(content=system_instructions_sections),
+                                                HumanMessage(content=planner_message)])
 
     # Get sections
     sections = report_sections.sections
 
     return {"sections": sections}
 
+# Kept synchronous: interrupt() reads the run's config from a context variable, which async nodes
+# only inherit on Python 3.11+, and the node does no I/O
 def human_feedback(state: ReportState, config: RunnableConfig) -> Command[Literal["generate_report_plan","build_section_with_web_research"]]:
     """ Get feedback on the report plan """
 
@@ -145,7 +140,7 @@ def human_feedback(state: ReportState, config: RunnableConfig) -> Command[Litera
     else:
         raise TypeError(f"Interrupt value of type {type(feedback)} is not supported.")
     
-def generate_queries(state: SectionState, config: RunnableConfig):
+async def generate_queries(state: SectionState, config: RunnableConfig):
     """ Generate search queries for a report section """
 
     # Get state 
@@ -159,8 +154,9 @@ def generate_queries(state: SectionState, config: RunnableConfig):
     # Generate queries 
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, temperature=0) 
-    structured_llm = writer_model.with_structured_output(Queries)
+    # Models are looked up per call, so each call can use another of the provider's API keys
+    def structured_llm(**api_key):
+        return get_chat_model(writer_model_name, writer_provider, structured_output=Queries, temperature=0, **api_key)
 
     # Format system instructions
     system_instructions = query_writer_instructions.format(topic=topic, 
@@ -168,8 +164,9 @@ def generate_queries(state: SectionState, config: RunnableConfig):
                                                            number_of_queries=number_of_queries)
 
     # Generate queries  
-    queries = structured_llm.invoke([SystemMessage(content=system_instructions),
-                                     HumanMessage(content="Generate search queries on the provided topic.")])
+    queries = await ainvoke_with_key_pool(writer_provider, structured_llm,
+                                   [SystemMessage(content=system_instructions),
+                                    HumanMessage(content="Generate search queries on the provided topic.")])
 
     return {"search_queries": queries.queries}
 
@@ -180,35 +177,72 @@ async def search_web(state: SectionState, config: RunnableConfig):
 
     # Get configuration
     configurable = Configuration.from_runnable_config(config)
-    search_api = get_config_value(configurable.search_api)
+    search_apis = get_search_apis(configurable.search_api, configurable.search_api_hedge)  # Primary search API first, then hedges
     search_api_config = configurable.search_api_config or {}  # Get the config dict, default to empty
-    params_to_pass = get_search_params(search_api, search_api_config)  # Filter parameters
 
     # Web search
     query_list = [query.search_query for query in search_queries]
 
-    # Search the web with parameters
-    if search_api == "tavily":
-        search_results = await tavily_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=5000, include_raw_content=True)
-    elif search_api == "perplexity":
-        search_results = perplexity_search(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=5000, include_raw_content=False)
-    elif search_api == "exa":
-        search_results = await exa_search(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "arxiv":
-        search_results = await arxiv_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
-    elif search_api == "pubmed":
-        search_results = await pubmed_search_async(query_list, **params_to_pass)
-        source_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, include_raw_content=False)
+    # Format sources using the settings of the primary search API: Tavily and local documents return full
+    # content and Perplexity a long answer, so they get a larger per-source budget
+    search_api = search_apis[0]
+    max_tokens_per_source = 5000 if search_api in ("tavily", "perplexity", "local") else 1000
+    include_raw_content = search_api in ("tavily", "local")
+
+    # Search the web with parameters, hedging slow queries if fallback search APIs are configured. Responses are
+    # collected as they complete, and the slowest queries are dropped once enough sources have arrived.
+    search_results = await collect_search_results(search_apis, query_list, search_api_config,
+                                                  max_tokens_per_source=max_tokens_per_source,
+                                                  include_raw_content=include_raw_content,
+                                                  percentile=float(configurable.hedge_delay_percentile),
+                                                  enough_sources=int(configurable.search_enough_sources) if configurable.search_enough_sources else None,
+                                                  enough_tokens=int(configurable.search_enough_tokens) if configurable.search_enough_tokens else None)
+
+    # Collapse repeated and near-duplicate sources. MinHash is CPU-bound, so keep it off the event loop.
+    search_results, tokens_removed = await asyncio.get_running_loop().run_in_executor(
+        None, collapse_duplicate_sources, search_results, max_tokens_per_source, include_raw_content, float(configurable.near_duplicate_threshold)
+    )
+    duplicate_tokens_removed = state.get("duplicate_tokens_removed", 0) + tokens_removed
+
+    # Sources sent in earlier iterations are already reflected in the section, so they are dropped before
+    # ranking; otherwise they would fill the top K and crowd out what the follow-up queries found
+    search_results = drop_seen_sources(search_results, state.get("source_store", {}))
+
+    # Rank the remaining sources by relevance to the section and keep the best, so the token budget below
+    # is spent on the most relevant sources first
+    section = state["section"]
+    top_k = int(configurable.rerank_top_k) if configurable.rerank_top_k else None
+    search_results = await asyncio.get_running_loop().run_in_executor(
+        None, rerank_sources, search_results, f"{section.name}\n{section.description}", max_tokens_per_source, include_raw_content, top_k
+    )
+
+    # Send the new sources within this iteration's share of the section's token budget. The writer already has
+    # the existing section content, which was written from the earlier sources, and gets their titles and URLs
+    # so they stay cited.
+    cited_sources_str = format_cited_sources(state.get("source_store", {}))
+    iteration_budget = iteration_token_budget(state.get("source_store", {}),
+                                              int(configurable.max_section_source_tokens),
+                                              int(configurable.max_search_depth),
+                                              state["search_iterations"])
+    if configurable.source_token_budget:
+        # Size the prompt with the writer model's tokenizer, giving more room to the most relevant sources,
+        # and charge the section for the tokens each source was actually given
+        source_str, sent_tokens = await asyncio.get_running_loop().run_in_executor(
+            None, format_sources_within_budget, search_results, min(int(configurable.source_token_budget), iteration_budget),
+            configurable.writer_model, include_raw_content
+        )
+        source_store = record_sent_sources(search_results, state.get("source_store", {}), sent_tokens)
     else:
-        raise ValueError(f"Unsupported search API: {search_api}")
+        new_results, source_store = select_new_sources(search_results, 
+                                                       state.get("source_store", {}), 
+                                                       max_tokens_per_source=max_tokens_per_source, 
+                                                       include_raw_content=include_raw_content, 
+                                                       token_budget=iteration_budget)
+        source_str = deduplicate_and_format_sources(new_results, max_tokens_per_source=max_tokens_per_source, include_raw_content=include_raw_content)
 
-    return {"source_str": source_str, "search_iterations": state["search_iterations"] + 1}
+    return {"source_str": source_str, "source_store": source_store, "cited_sources_str": cited_sources_str, "duplicate_tokens_removed": duplicate_tokens_removed, "search_iterations": state["search_iterations"] + 1}
 
-def write_section(state: SectionState, config: RunnableConfig) -> Command[Literal[END, "search_web"]]:
+async def write_section(state: SectionState, config: RunnableConfig) -> Command[Literal[END, "search_web"]]:
     """ Write a section of the report """
 
     # Get state 
@@ -224,14 +258,17 @@ def write_section(state: SectionState, config: RunnableConfig) -> Command[Litera
                                                              section_name=section.name, 
                                                              section_topic=section.description, 
                                                              context=source_str, 
+                                                             cited_sources=state.get("cited_sources_str", "None"),
                                                              section_content=section.content)
 
     # Generate section  
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, temperature=0) 
-    section_content = writer_model.invoke([SystemMessage(content=system_instructions),
-                                           HumanMessage(content="Generate a report section based on the provided sources.")])
+    def writer_model(**api_key):
+        return get_chat_model(writer_model_name, writer_provider, temperature=0, **api_key)
+    section_content = await ainvoke_with_key_pool(writer_provider, writer_model,
+                                           [SystemMessage(content=system_instructions),
+                                            HumanMessage(content="Generate a report section based on the provided sources.")])
     
     # Write content to the section object  
     section.content = section_content.content
@@ -253,24 +290,29 @@ def write_section(state: SectionState, config: RunnableConfig) -> Command[Litera
     # If the planner model is claude-3-7-sonnet-latest, we need to use bind_tools to use thinking when generating the feedback 
     if planner_model == "claude-3-7-sonnet-latest":
         # Allocate a thinking budget for claude-3-7-sonnet-latest as the planner model
-        reflection_model = init_chat_model(model=planner_model, 
-                                           model_provider=planner_provider, 
-                                           max_tokens=20_000, 
-                                           thinking={"type": "enabled", "budget_tokens": 16_000})
-        
         # with_structured_output uses forced tool calling, which thinking mode with Claude 3.7 does not support
         # So, we use bind_tools without enforcing tool calling to generate the report sections
-        reflection_result = reflection_model.bind_tools([Feedback]).invoke([SystemMessage(content=section_grader_instructions_formatted),
-                                                                            HumanMessage(content=section_grader_message)])
+        def reflection_model(**api_key):
+            return get_chat_model(planner_model, 
+                                  planner_provider, 
+                                  tools=[Feedback],
+                                  max_tokens=20_000, 
+                                  thinking={"type": "enabled", "budget_tokens": 16_000},
+                                  **api_key)
+        
+        reflection_result = await ainvoke_with_key_pool(planner_provider, reflection_model,
+                                                 [SystemMessage(content=section_grader_instructions_formatted),
+                                                  HumanMessage(content=section_grader_message)])
         tool_call = reflection_result.tool_calls[0]['args']
         feedback = Feedback.model_validate(tool_call)
     
     else:
-        reflection_model = init_chat_model(model=planner_model, 
-                                           model_provider=planner_provider).with_structured_output(Feedback)
+        def reflection_model(**api_key):
+            return get_chat_model(planner_model, planner_provider, structured_output=Feedback, **api_key)
         
-        feedback = reflection_model.invoke([SystemMessage(content=section_grader_instructions_formatted),
-                                            HumanMessage(content=section_grader_message)])
+        feedback = await ainvoke_with_key_pool(planner_provider, reflection_model,
+                                        [SystemMessage(content=section_grader_instructions_formatted),
+                                         HumanMessage(content=section_grader_message)])
 
     # If the section is passing or the max search depth is reached, publish the section to completed sections 
     if feedback.grade == "pass" or state["search_iterations"] >= configurable.max_search_depth:
@@ -286,7 +328,7 @@ def write_section(state: SectionState, config: RunnableConfig) -> Command[Litera
         goto="search_web"
         )
     
-def write_final_sections(state: SectionState, config: RunnableConfig):
+async def write_final_sections(state: SectionState, config: RunnableConfig):
     """ Write final sections of the report, which do not require web search and use the completed sections as context """
 
     # Get configuration
@@ -303,9 +345,11 @@ def write_final_sections(state: SectionState, config: RunnableConfig):
     # Generate section  
     writer_provider = get_config_value(configurable.writer_provider)
     writer_model_name = get_config_value(configurable.writer_model)
-    writer_model = init_chat_model(model=writer_model_name, model_provider=writer_provider, temperature=0) 
-    section_content = writer_model.invoke([SystemMessage(content=system_instructions),
-                                           HumanMessage(content="Generate a report section based on the provided sources.")])
+    def writer_model(**api_key):
+        return get_chat_model(writer_model_name, writer_provider, temperature=0, **api_key)
+    section_content = await ainvoke_with_key_pool(writer_provider, writer_model,
+                                           [SystemMessage(content=system_instructions),
+                                            HumanMessage(content="Generate a report section based on the provided sources.")])
     
     # Write content to section 
     section.content = section_content.content
@@ -313,7 +357,7 @@ def write_final_sections(state: SectionState, config: RunnableConfig):
     # Write the updated section to completed sections
     return {"completed_sections": [section]}
 
-def gather_completed_sections(state: ReportState):
+async def gather_completed_sections(state: ReportState):
     """ Gather completed sections from research and format them as context for writing the final sections """    
 
     # List of completed sections
@@ -324,7 +368,7 @@ def gather_completed_sections(state: ReportState):
 
     return {"report_sections_from_research": completed_report_sections}
 
-def initiate_final_section_writing(state: ReportState):
+async def initiate_final_section_writing(state: ReportState):
     """ Write any final sections using the Send API to parallelize the process """    
 
     # Kick off section writing in parallel via Send() API for any sections that do not require research
@@ -334,7 +378,7 @@ def initiate_final_section_writing(state: ReportState):
         if not s.research
     ]
 
-def compile_final_report(state: ReportState):
+async def compile_final_report(state: ReportState):
     """ Compile the final report """    
 
     # Get sections
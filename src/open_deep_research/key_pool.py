@@ -0,0 +1,157 @@
+import os
+import time
+import logging
+import threading
+
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a key is left out of rotation after a 429 without a Retry-After header. Doubles with every
+# further 429 in a row, up to MAX_RATE_LIMIT_COOLDOWN.
+DEFAULT_RATE_LIMIT_COOLDOWN = 30.0
+MAX_RATE_LIMIT_COOLDOWN = 600.0
+# Seconds a key is left out of rotation after it was rejected (401/403), e.g. revoked or out of credit
+REJECTED_KEY_COOLDOWN = 3600.0
+# Window over which requests per key are counted against its quota
+QUOTA_WINDOW = 60.0
+
+
+class ApiKey:
+    """ Usage and health of one API key """
+
+    def __init__(self, value: str, quota: Optional[int] = None):
+        self.value = value
+        self.quota = quota
+        self.in_flight = 0
+        self.recent = deque()
+        self.cooldown_until = 0.0
+        self.rate_limited_in_a_row = 0
+        self.reported_remaining: Optional[int] = None
+        self.reported_at = 0.0
+
+    def remaining(self, now: float) -> float:
+        """ Requests the key can still make in the current window, as reported by the provider or estimated from its quota """
+        while self.recent and self.recent[0] <= now - QUOTA_WINDOW:
+            self.recent.popleft()
+        if self.reported_remaining is not None and now - self.reported_at < QUOTA_WINDOW:
+            # Requests sent since the report aren't reflected in it yet
+            return self.reported_remaining - sum(1 for sent in self.recent if sent > self.reported_at)
+        if self.quota is not None:
+            return self.quota - len(self.recent)
+        # Without a quota, spread requests evenly: the least used key has the most left
+        return -len(self.recent)
+
+
+class KeyPool:
+    """
+    Several API keys for one provider, handed out by remaining quota.
+
+    Each request leases the key with the most requests left in the current window (as reported by
+    the provider's rate limit headers, or estimated from a configured per-key quota), preferring keys
+    with fewer requests in flight. A key that gets a 429 is left out of rotation until its Retry-After
+    (or an exponentially growing cooldown) has passed, and a key that is rejected outright for an hour.
+    Guarded by a threading lock, so one pool is shared by every event loop and thread in the process.
+    """
+
+    def __init__(self, keys: List[str], quota: Optional[int] = None):
+        if not keys:
+            raise ValueError("A key pool needs at least one key")
+        self.keys = [ApiKey(key, quota) for key in dict.fromkeys(keys)]
+        self._by_value = {key.value: key for key in self.keys}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self) -> str:
+        """ Lease the best key for the next request. Must be handed back with release. """
+        with self._lock:
+            now = time.monotonic()
+            ready = [key for key in self.keys if key.cooldown_until <= now]
+            if ready:
+                key = max(ready, key=lambda key: (key.remaining(now), -key.in_flight))
+            else:
+                # Every key is cooling down; use the one that recovers first rather than failing outright
+                key = min(self.keys, key=lambda key: key.cooldown_until)
+            key.in_flight += 1
+            key.recent.append(now)
+            return key.value
+
+    def release(self, value: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                remaining: Optional[int] = None) -> None:
+        """
+        Hand a leased key back with the outcome of its request.
+
+        Args:
+            value (str): The leased key.
+            status (int, optional): HTTP status of a failed request. 429 and 401/403 take the key out of rotation.
+            retry_after (float, optional): Seconds the provider asked to wait, for a 429.
+            remaining (int, optional): Requests left for the key, from the provider's rate limit headers.
+        """
+        with self._lock:
+            key = self._by_value.get(value)
+            if key is None:
+                return
+            now = time.monotonic()
+            key.in_flight = max(0, key.in_flight - 1)
+            if remaining is not None:
+                key.reported_remaining = remaining
+                key.reported_at = now
+            if status == 429:
+                key.rate_limited_in_a_row += 1
+                cooldown = retry_after if retry_after is not None else min(
+                    DEFAULT_RATE_LIMIT_COOLDOWN * 2 ** (key.rate_limited_in_a_row - 1), MAX_RATE_LIMIT_COOLDOWN
+                )
+                key.cooldown_until = max(key.cooldown_until, now + cooldown)
+                logger.warning("API key ...%s is rate limited, taking it out of rotation for %.0fs", value[-4:], cooldown)
+            elif status in (401, 403):
+                key.cooldown_until = now + REJECTED_KEY_COOLDOWN
+                logger.warning("API key ...%s was rejected, taking it out of rotation", value[-4:])
+            elif status is None:
+                key.rate_limited_in_a_row = 0
+
+    def available(self) -> int:
+        """ Number of keys currently in rotation """
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for key in self.keys if key.cooldown_until <= now)
+
+
+def api_keys(name: str) -> List[str]:
+    """ Keys for a provider from <NAME>_API_KEYS (comma-separated) or, failing that, <NAME>_API_KEY """
+    keys = [key.strip() for key in os.environ.get(f"{name.upper()}_API_KEYS", "").split(",") if key.strip()]
+    if not keys and os.environ.get(f"{name.upper()}_API_KEY"):
+        keys = [os.environ[f"{name.upper()}_API_KEY"]]
+    return keys
+
+_key_pools: Dict[tuple, KeyPool] = {}
+_key_pools_lock = threading.Lock()
+
+def get_key_pool(name: str) -> Optional[KeyPool]:
+    """
+    Returns the process-wide key pool of a provider, e.g. "tavily" or "anthropic".
+
+    Configured through environment variables:
+        <NAME>_API_KEYS: Comma-separated keys. Falls back to the single key in <NAME>_API_KEY.
+        <NAME>_KEY_QUOTA: Requests per minute allowed per key, used to estimate each key's remaining quota
+            when the provider doesn't report it.
+
+    Returns:
+        Optional[KeyPool]: The pool, or None if no key is configured.
+    """
+    keys = api_keys(name)
+    if not keys:
+        return None
+    quota = os.environ.get(f"{name.upper()}_KEY_QUOTA")
+    # Keyed by the keys themselves, so changing the environment gets a new pool
+    pool_key = (name.lower(), tuple(keys), quota)
+    pool = _key_pools.get(pool_key)
+    if pool is None:
+        with _key_pools_lock:
+            pool = _key_pools.get(pool_key)
+            if pool is None:
+                pool = KeyPool(keys, int(quota) if quota else None)
+                _key_pools[pool_key] = pool
+    return pool
@@ -0,0 +1,200 @@
+import os
+import re
+import sqlite3
+import hashlib
+import logging
+import threading
+
+import pymupdf
+
+from typing import Dict, List, Optional, Tuple
+from open_deep_research.cache import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# File types picked up from the corpus directory
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".rst"}
+PDF_EXTENSIONS = {".pdf"}
+
+# Documents are indexed as passages of roughly this many characters so results point at relevant text
+CHUNK_CHARS = 1500
+
+# Memory-map up to this many bytes of the index file, so opening and querying it doesn't read it into the heap
+INDEX_MMAP_BYTES = 1 << 30
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def read_document(path: str) -> Tuple[str, str]:
+    """
+    Reads a text, markdown or PDF file.
+
+    Returns:
+        Tuple[str, str]: The document title (first markdown heading or the file name) and its full text.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PDF_EXTENSIONS:
+        with pymupdf.open(path) as pdf:
+            text = "\n\n".join(page.get_text() for page in pdf)
+            title = (pdf.metadata or {}).get("title") or ""
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            text = file.read()
+        heading = re.search(r"^#\s+(.+)$", text, re.MULTILINE)
+        title = heading.group(1).strip() if heading else ""
+    return title or os.path.basename(path), text
+
+def chunk_text(text: str, chunk_chars: int = CHUNK_CHARS) -> List[str]:
+    """ Split text into passages of about chunk_chars characters, breaking on paragraph boundaries where possible """
+    chunks = []
+    current = []
+    current_len = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        # Hard-split paragraphs that are longer than a chunk on their own
+        while len(paragraph) > chunk_chars:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_len = [], 0
+            chunks.append(paragraph[:chunk_chars])
+            paragraph = paragraph[chunk_chars:]
+        if current_len + len(paragraph) > chunk_chars and current:
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+        current.append(paragraph)
+        current_len += len(paragraph)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def to_match_query(query: str) -> str:
+    """ Turn free text into an FTS5 MATCH expression that ORs the quoted query terms """
+    terms = TOKEN_PATTERN.findall(query.lower())
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+class LocalIndex:
+    """
+    Persistent BM25 index over a directory of text, markdown and PDF files.
+
+    The index is an SQLite FTS5 table (which ranks with BM25) opened with memory-mapped I/O, so it
+    opens instantly and is paged in on demand. refresh() only re-reads files whose size or
+    modification time changed since they were indexed, and drops files that were deleted.
+    """
+
+    def __init__(self, corpus_dir: str, index_path: Optional[str] = None):
+        self.corpus_dir = os.path.abspath(corpus_dir)
+        if index_path is None:
+            digest = hashlib.sha256(self.corpus_dir.encode("utf-8")).hexdigest()[:16]
+            index_path = os.path.join(get_cache_dir(), f"local_index_{digest}.sqlite")
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute(f"PRAGMA mmap_size={INDEX_MMAP_BYTES}")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, title TEXT, mtime REAL, size INTEGER)")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+                "path UNINDEXED, position UNINDEXED, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def _corpus_files(self) -> Dict[str, os.stat_result]:
+        """ All indexable files under the corpus directory with their stat info """
+        files = {}
+        for root, _, names in os.walk(self.corpus_dir):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS | PDF_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    files[path] = os.stat(path)
+        return files
+
+    def refresh(self) -> int:
+        """
+        Brings the index up to date with the corpus directory.
+
+        Returns:
+            int: The number of files that were added, re-indexed or removed.
+        """
+        on_disk = self._corpus_files()
+        with self._lock:
+            indexed = {path: (mtime, size) for path, mtime, size in self._conn.execute("SELECT path, mtime, size FROM files")}
+
+        changed = [path for path, stat in on_disk.items() if indexed.get(path) != (stat.st_mtime, stat.st_size)]
+        removed = [path for path in indexed if path not in on_disk]
+
+        for path in changed:
+            try:
+                title, text = read_document(path)
+            except Exception as e:
+                logger.warning("Error indexing local document '%s': %s", path, e)
+                continue
+            stat = on_disk[path]
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+                self._conn.executemany(
+                    "INSERT INTO chunks (path, position, body) VALUES (?, ?, ?)",
+                    [(path, position, chunk) for position, chunk in enumerate(chunk_text(text))],
+                )
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, title, stat.st_mtime, stat.st_size))
+
+        if removed:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM chunks WHERE path = ?", [(path,) for path in removed])
+                self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+
+        return len(changed) + len(removed)
+
+    def search(self, query: str, max_results: int = 5, chunks_per_document: int = 3) -> List[dict]:
+        """
+        Finds the documents that best match a query.
+
+        Args:
+            query (str): Free-text search query.
+            max_results (int): Maximum number of documents to return.
+            chunks_per_document (int): Maximum number of matching passages kept per document.
+
+        Returns:
+            List[dict]: One entry per document, best first, with 'path', 'title', 'score' (BM25, higher is better),
+            'best_chunk' (the passage that matches best) and 'chunks' (matching passages in document order).
+        """
+        match = to_match_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunks.path, chunks.position, chunks.body, -bm25(chunks) AS score, files.title "
+                "FROM chunks JOIN files ON files.path = chunks.path "
+                "WHERE chunks MATCH ? ORDER BY score DESC LIMIT ?",
+                (match, max_results * chunks_per_document * 4),
+            ).fetchall()
+
+        documents: Dict[str, dict] = {}
+        for path, position, body, score, title in rows:
+            document = documents.get(path)
+            if document is None:
+                if len(documents) >= max_results:
+                    continue
+                # Rows come best first, so a document's first row is its best matching passage
+                document = documents[path] = {"path": path, "title": title, "score": score, "best_chunk": body, "chunks": []}
+            if len(document["chunks"]) < chunks_per_document:
+                document["chunks"].append((int(position), body))
+
+        for document in documents.values():
+            document["chunks"] = [body for _, body in sorted(document["chunks"])]
+        return list(documents.values())
+
+
+_indexes: Dict[Tuple[str, Optional[str]], LocalIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_local_index(corpus_dir: str, index_path: Optional[str] = None) -> LocalIndex:
+    """ Shared LocalIndex for a corpus directory, opened on first use """
+    key = (os.path.abspath(corpus_dir), index_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LocalIndex(corpus_dir, index_path)
+    return index
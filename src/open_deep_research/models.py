@@ -0,0 +1,59 @@
+import asyncio
+
+from langchain.chat_models import init_chat_model
+from typing import Any, Hashable, Optional, Sequence
+from open_deep_research.clients import client_registry
+
+
+def _freeze(value: Any) -> Hashable:
+    """ Hashable form of a model parameter, e.g. the thinking settings dict """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def get_chat_model(model: str, model_provider: str, structured_output: Optional[type] = None,
+                   tools: Optional[Sequence[Any]] = None, **kwargs):
+    """
+    Shared chat model, built with init_chat_model on first use.
+
+    Models are keyed by provider, model name and every parameter (including an API key), so nodes,
+    sections and runs with the same settings reuse one instance, with its provider client, connection
+    pool and TLS sessions, instead of building a new one per call. The with_structured_output and
+    bind_tools variants are cached the same way. Provider clients hold async connections bound to the
+    event loop that used them, so inside a running loop models are shared per loop.
+
+    Args:
+        model (str): Model name, e.g. "claude-3-5-sonnet-latest".
+        model_provider (str): Provider, e.g. "anthropic".
+        structured_output (type, optional): Schema to return the model's with_structured_output variant for.
+        tools (Sequence, optional): Tools to return the model's bind_tools variant for.
+        **kwargs: Parameters passed to init_chat_model, e.g. temperature or api_key.
+
+    Returns:
+        The chat model, or its structured output or tool-calling variant.
+    """
+    key = ("chat_model", model_provider, model, _freeze(kwargs))
+    # Variants wrap the shared base model, which is looked up first since the registry lock isn't reentrant
+    if structured_output is not None:
+        base = get_chat_model(model, model_provider, **kwargs)
+        key += ("structured_output", structured_output)
+
+        def factory():
+            return base.with_structured_output(structured_output)
+    elif tools is not None:
+        base = get_chat_model(model, model_provider, **kwargs)
+        key += ("tools", tuple(tools))
+
+        def factory():
+            return base.bind_tools(list(tools))
+    else:
+        def factory():
+            return init_chat_model(model=model, model_provider=model_provider, **kwargs)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return client_registry.get(key, factory)
+    return client_registry.get_for_loop(key, factory)
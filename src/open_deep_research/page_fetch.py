@@ -0,0 +1,242 @@
+import os
+import re
+import time
+import html
+import asyncio
+import logging
+
+import httpx
+
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from open_deep_research.boilerplate import clean_page_text
+from open_deep_research.clients import client_registry
+from open_deep_research.content_store import canonicalize_url, get_content_store
+from open_deep_research.pdf_extract import extract_pdf_text_async
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "open-deep-research"
+
+# Concurrent requests per host, and in total across all hosts
+DEFAULT_MAX_PER_HOST = 2
+DEFAULT_MAX_CONNECTIONS = 32
+# Seconds allowed for a whole page fetch, including connecting and reading the body
+DEFAULT_FETCH_TIMEOUT = 15.0
+# Bytes of a response body read at most; the rest of larger pages is never downloaded
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+# Characters of fetched text kept per page, and used as the snippet of results that had none
+MAX_PAGE_CHARS = 32_000
+SNIPPET_CHARS = 500
+# Longest Crawl-delay from robots.txt that is honored; hosts asking for more are spaced out by this much
+MAX_CRAWL_DELAY = 5.0
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+PDF_CONTENT_TYPE = "application/pdf"
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+
+class PageFetcher:
+    """
+    Fetches and extracts the text of web pages concurrently over one shared connection pool.
+
+    Requests are capped per host, and every host's robots.txt is fetched once and obeyed, including
+    its Crawl-delay (up to MAX_CRAWL_DELAY seconds). Pages already in the shared content store are not
+    fetched again. HTML and text pages go through the boilerplate cleaner, PDFs through the PDF process
+    pool. Fetch and extraction errors are logged and the page is skipped, so a slow or broken site never fails a search.
+
+    Holds asyncio primitives and an httpx client, so one fetcher is used per event loop (see get_page_fetcher).
+    """
+
+    def __init__(self, max_per_host: int = DEFAULT_MAX_PER_HOST, timeout: float = DEFAULT_FETCH_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.client = httpx.AsyncClient(
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections // 2),
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._robots: Dict[str, asyncio.Task] = {}
+        self._next_request: Dict[str, float] = {}
+
+    async def _get_robots(self, origin: str) -> Optional[RobotFileParser]:
+        """ Parsed robots.txt of an origin, or None if there are no rules """
+        try:
+            response = await self.client.get(f"{origin}/robots.txt", timeout=min(self.timeout, 5.0))
+        except httpx.HTTPError:
+            return None
+        parser = RobotFileParser()
+        if response.status_code in (401, 403):
+            # As urllib.robotparser does: an access-controlled robots.txt means the whole site is off limits
+            parser.disallow_all = True
+        elif response.is_success:
+            parser.parse(response.text.splitlines())
+        else:
+            return None
+        return parser
+
+    async def _robots_for(self, origin: str) -> Optional[RobotFileParser]:
+        """ robots.txt of an origin, fetched once and shared by every concurrent request to it """
+        task = self._robots.get(origin)
+        if task is None:
+            task = self._robots[origin] = asyncio.ensure_future(self._get_robots(origin))
+        return await task
+
+    async def _wait_turn(self, host: str, delay: float) -> None:
+        """ Space consecutive requests to a host at least delay seconds apart """
+        now = time.monotonic()
+        start = max(now, self._next_request.get(host, now))
+        self._next_request[host] = start + delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _download(self, url: str):
+        """
+        Content type, body (at most MAX_PAGE_BYTES) and encoding of a page, or None if it isn't HTML, text
+        or PDF, or is a PDF larger than MAX_PAGE_BYTES (a truncated PDF can't be parsed)
+        """
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type != PDF_CONTENT_TYPE and content_type not in HTML_CONTENT_TYPES:
+                return None
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= MAX_PAGE_BYTES:
+                    if content_type == PDF_CONTENT_TYPE:
+                        logger.info("Skipping %s: PDF larger than %d bytes", url, MAX_PAGE_BYTES)
+                        return None
+                    break
+            return content_type, bytes(body), response.encoding or "utf-8"
+
+    async def fetch(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Fetches one page.
+
+        Args:
+            url (str): Page URL.
+
+        Returns:
+            Optional[Dict[str, str]]: The page's 'title' and extracted 'text', or None if it is disallowed
+                by robots.txt, not HTML, text or PDF, or could not be fetched or extracted.
+        """
+        try:
+            return await self._fetch(url)
+        except Exception as e:
+            # Any failure, e.g. an unparseable PDF or an unknown charset, only skips this page
+            logger.info("Could not fetch %s: %s", url, str(e) or type(e).__name__)
+            return None
+
+    async def _fetch(self, url: str) -> Optional[Dict[str, str]]:
+        """ Fetches and extracts one page; errors are left to fetch """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            return None
+        host = parts.netloc.lower()
+        robots = await self._robots_for(f"{parts.scheme}://{host}")
+        if robots is not None and not robots.can_fetch(USER_AGENT, url):
+            logger.info("Skipping %s: disallowed by robots.txt", url)
+            return None
+        crawl_delay = float(robots.crawl_delay(USER_AGENT) or 0) if robots is not None else 0.0
+
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with slots:
+            await self._wait_turn(host, min(crawl_delay, MAX_CRAWL_DELAY))
+            downloaded = await asyncio.wait_for(self._download(url), self.timeout)
+        if downloaded is None:
+            return None
+        content_type, body, encoding = downloaded
+
+        if content_type == PDF_CONTENT_TYPE:
+            text, _ = await extract_pdf_text_async(body, MAX_PAGE_CHARS)
+            return {"title": "", "text": text}
+        page = body.decode(encoding, errors="replace")
+        title = TITLE_PATTERN.search(page)
+        # The title is returned separately, so it doesn't open the text as well
+        text = await asyncio.get_running_loop().run_in_executor(None, clean_page_text, TITLE_PATTERN.sub("", page, count=1))
+        return {
+            "title": " ".join(html.unescape(title.group(1)).split()) if title else "",
+            "text": text[:MAX_PAGE_CHARS],
+        }
+
+    async def fetch_many(self, urls: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Fetches several pages concurrently, serving pages already in the content store without a request
+        and adding freshly fetched pages to it.
+
+        Args:
+            urls (List[str]): Page URLs.
+
+        Returns:
+            Dict[str, Dict[str, str]]: 'title' and 'text' of each page that has text, keyed by the given URL.
+        """
+        urls = list(dict.fromkeys(urls))
+        pages = {}
+        store = get_content_store()
+        if store is not None:
+            stored = await asyncio.get_running_loop().run_in_executor(None, store.get_many, urls)
+            for url in urls:
+                page = stored.get(canonicalize_url(url))
+                if page is not None:
+                    pages[url] = page
+
+        missing = [url for url in urls if url not in pages]
+        fetched = {}
+        for url, page in zip(missing, await asyncio.gather(*[self.fetch(url) for url in missing])):
+            if page is not None and page["text"]:
+                pages[url] = fetched[url] = page
+        if store is not None and fetched:
+            to_store = {url: (page["title"], page["text"]) for url, page in fetched.items()}
+            await asyncio.get_running_loop().run_in_executor(None, store.set_many, to_store)
+        return pages
+
+    async def fill_missing_content(self, results: List[dict]) -> None:
+        """
+        Fetches the pages of search results that came back without raw_content and fills them in, in place.
+
+        The page text becomes the result's raw_content, its opening becomes the snippet, and the page
+        title replaces the result's title when it has one. Results whose page can't be fetched are left as they are.
+
+        Args:
+            results (List[dict]): Search result dicts with 'url', 'title', 'content' and 'raw_content'.
+        """
+        missing = [result for result in results if not result.get("raw_content") and result.get("url")]
+        if not missing:
+            return
+        pages = await self.fetch_many([result["url"] for result in missing])
+        for result in missing:
+            page = pages.get(result["url"])
+            if page is None:
+                continue
+            result["raw_content"] = page["text"]
+            result["content"] = page["text"][:SNIPPET_CHARS]
+            if page["title"]:
+                result["title"] = page["title"]
+
+
+def get_page_fetcher() -> Optional[PageFetcher]:
+    """
+    Returns the page fetcher for the running event loop, creating it on first use.
+
+    Configured through environment variables:
+        PAGE_FETCH_DISABLED: Set to "true" to never fetch pages for results without content.
+        PAGE_FETCH_MAX_PER_HOST: Concurrent requests per host.
+        PAGE_FETCH_TIMEOUT: Seconds allowed per page.
+
+    Returns:
+        Optional[PageFetcher]: The shared fetcher, or None if fetching is disabled.
+    """
+    if os.environ.get("PAGE_FETCH_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    return client_registry.get_for_loop(
+        ("page_fetcher",),
+        lambda: PageFetcher(
+            max_per_host=int(os.environ.get("PAGE_FETCH_MAX_PER_HOST", DEFAULT_MAX_PER_HOST)),
+            timeout=float(os.environ.get("PAGE_FETCH_TIMEOUT", DEFAULT_FETCH_TIMEOUT)),
+        ),
+    )
@@ -0,0 +1,109 @@
+import os
+import re
+import asyncio
+import threading
+import multiprocessing
+
+import pymupdf
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from open_deep_research.cache import get_cache_dir
+
+# Number of worker processes used for PDF text extraction. PyMuPDF parsing is CPU-bound and holds
+# the GIL, so it runs in separate processes instead of the default thread pool.
+DEFAULT_PDF_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def extract_pdf_text(pdf_bytes: bytes, max_chars: int) -> tuple:
+    """
+    Extracts text from a PDF page by page, stopping once max_chars characters have been read.
+    Runs in a worker process.
+
+    Returns:
+        tuple: The extracted text (at most max_chars characters) and whether the whole document was read.
+    """
+    parts = []
+    total = 0
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        for page in pdf:
+            text = page.get_text()
+            parts.append(text)
+            total += len(text)
+            if total >= max_chars:
+                return "".join(parts)[:max_chars], False
+    return "".join(parts), True
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool for PDF extraction, created on first use.
+    The pool size can be set with the PDF_EXTRACT_WORKERS environment variable.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Spawned workers don't inherit the parent's threads and locks, which forking a
+                # multi-threaded server process could deadlock on
+                _executor = ProcessPoolExecutor(
+                    max_workers=int(os.environ.get("PDF_EXTRACT_WORKERS", DEFAULT_PDF_WORKERS)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+class ExtractedTextCache:
+    """
+    On-disk cache of text extracted from arXiv PDFs, keyed by arXiv ID and version.
+
+    A given arXiv version never changes, so entries never expire. Each entry records whether it holds the
+    whole document or only a prefix; a prefix is reused for any budget it covers.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(get_cache_dir(), "arxiv_text")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, arxiv_id: str, complete: bool) -> str:
+        # Old-style IDs such as quant-ph/0201082v1 contain a slash
+        safe_id = re.sub(r"[^\w.\-]", "_", arxiv_id)
+        return os.path.join(self.directory, f"{safe_id}.{'full' if complete else 'partial'}.txt")
+
+    def get(self, arxiv_id: str, max_chars: int) -> Optional[str]:
+        """ Cached text for the given budget, or None if the cache doesn't cover it """
+        for complete in (True, False):
+            path = self._path(arxiv_id, complete)
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    text = file.read(max_chars)
+            except FileNotFoundError:
+                continue
+            if complete or len(text) >= max_chars:
+                return text
+        return None
+
+    def set(self, arxiv_id: str, text: str, complete: bool) -> None:
+        """ Store extracted text, written atomically so concurrent runs never read a partial file """
+        path = self._path(arxiv_id, complete)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+
+_text_cache: Optional[ExtractedTextCache] = None
+
+def get_extracted_text_cache() -> ExtractedTextCache:
+    """ Shared cache of extracted arXiv text """
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = ExtractedTextCache()
+    return _text_cache
+
+async def extract_pdf_text_async(pdf_bytes: bytes, max_chars: int) -> tuple:
+    """ Run extract_pdf_text in the shared process pool """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pdf_executor(), extract_pdf_text, pdf_bytes, max_chars)
@@ -116,9 +116,14 @@ section_writer_instructions = """You are an expert technical writer crafting one
 {context}
 </Source material>
 
+<Previously cited sources>
+{cited_sources}
+</Previously cited sources>
+
 <Guidelines for writing>
 1. If the existing section content is not populated, write a new section from scratch.
 2. If the existing section content is populated, write a new section that synthesizes the existing section content with the Source material.
+3. The existing section content was written from the Previously cited sources, which are not repeated in the Source material.
 </Guidelines for writing>
 
 <Length and style>
@@ -135,7 +140,7 @@ section_writer_instructions = """You are an expert technical writer crafting one
     - Use `*` or `-` for unordered lists
     - Use `1.` for ordered lists
     - Ensure proper indentation and spacing
-- End with ### Sources that references the below source material formatted as:
+- End with ### Sources that references the Source material and the Previously cited sources you still draw on, formatted as:
   * List each source with title, date, and URL
   * Format: `- Title : URL`
 </Length and style>
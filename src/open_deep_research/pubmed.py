@@ -0,0 +1,136 @@
+import re
+import asyncio
+
+import httpx
+import xmltodict
+
+from typing import Dict, List, Optional
+
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+# Identifies this client to NCBI, which asks every E-utilities caller to send a tool name and email
+EUTILS_TOOL = "open_deep_research"
+
+# Inline formatting tags PubMed uses inside titles and abstracts. xmltodict can't keep mixed content in
+# order, so they are dropped before parsing to keep the surrounding text intact.
+INLINE_MARKUP_PATTERN = re.compile(rb"</?(?:i|b|u|sup|sub)>")
+
+
+def _text(value) -> str:
+    """ Plain text of an xmltodict node, which is a string, a dict with '#text' when the element has attributes or markup, or a list of either """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return value.get("#text", "")
+    if isinstance(value, list):
+        return " ".join(_text(item) for item in value)
+    return str(value)
+
+def _format_abstract(abstract_text) -> str:
+    """ Join the AbstractText elements of an article, keeping section labels such as BACKGROUND or METHODS """
+    if not abstract_text:
+        return "No abstract available"
+    if not isinstance(abstract_text, list):
+        abstract_text = [abstract_text]
+    parts = []
+    for part in abstract_text:
+        text = _text(part)
+        if isinstance(part, dict) and part.get("@Label") and text:
+            parts.append(f"{part['@Label']}: {text}")
+        elif text:
+            parts.append(text)
+    return "\n".join(parts) or "No abstract available"
+
+def parse_article(tag: str, item: dict) -> Optional[dict]:
+    """
+    Extracts the fields used by the search backend from one PubmedArticle or PubmedBookArticle element.
+
+    Returns:
+        Optional[dict]: 'uid', 'Title', 'Published', 'Copyright Information' and 'Summary', or None if the element has no PMID.
+    """
+    if tag == "PubmedArticle":
+        citation = item.get("MedlineCitation") or {}
+        article = citation.get("Article") or {}
+        uid = _text(citation.get("PMID"))
+    elif tag == "PubmedBookArticle":
+        article = item.get("BookDocument") or {}
+        uid = _text(article.get("PMID"))
+    else:
+        return None
+    if not uid:
+        return None
+
+    abstract = article.get("Abstract") or {}
+    article_date = article.get("ArticleDate") or {}
+    if isinstance(article_date, list):
+        article_date = article_date[0]
+    return {
+        "uid": uid,
+        "Title": _text(article.get("ArticleTitle") or article.get("BookTitle")),
+        "Published": "-".join(part for part in (article_date.get("Year"), article_date.get("Month"), article_date.get("Day")) if part),
+        "Copyright Information": _text(abstract.get("CopyrightInformation")),
+        "Summary": _format_abstract(abstract.get("AbstractText")),
+    }
+
+def parse_efetch_xml(xml: bytes) -> Dict[str, dict]:
+    """
+    Parses an efetch response article by article.
+
+    xmltodict hands each article to a callback as soon as its closing tag is read, so only one article's
+    tree is held in memory at a time instead of the whole PubmedArticleSet.
+
+    Returns:
+        Dict[str, dict]: Parsed articles keyed by PMID.
+    """
+    articles = {}
+
+    def handle_article(path, item):
+        tag = path[-1][0]
+        if isinstance(item, dict):
+            article = parse_article(tag, item)
+            if article is not None:
+                articles[article["uid"]] = article
+        return True
+
+    xmltodict.parse(INLINE_MARKUP_PATTERN.sub(b"", xml), item_depth=2, item_callback=handle_article)
+    return articles
+
+
+def _eutils_params(email: Optional[str], api_key: Optional[str]) -> dict:
+    """ Parameters sent with every E-utilities request """
+    params = {"db": "pubmed", "tool": EUTILS_TOOL}
+    if email:
+        params["email"] = email
+    if api_key:
+        params["api_key"] = api_key
+    return params
+
+async def esearch(client: httpx.AsyncClient, query: str, retmax: int, email: Optional[str] = None, api_key: Optional[str] = None) -> List[str]:
+    """
+    Runs one esearch request.
+
+    Returns:
+        List[str]: PMIDs of the best matches, best first.
+    """
+    params = {**_eutils_params(email, api_key), "term": query, "retmode": "json", "retmax": retmax}
+    response = await client.get(f"{EUTILS_BASE_URL}/esearch.fcgi", params=params)
+    response.raise_for_status()
+    return response.json().get("esearchresult", {}).get("idlist", [])
+
+async def efetch(client: httpx.AsyncClient, uids: List[str], email: Optional[str] = None, api_key: Optional[str] = None) -> Dict[str, dict]:
+    """
+    Fetches many articles with a single efetch request. IDs are POSTed, as NCBI recommends for long ID lists.
+
+    Returns:
+        Dict[str, dict]: Parsed articles keyed by PMID.
+    """
+    if not uids:
+        return {}
+    data = {**_eutils_params(email, api_key), "id": ",".join(uids), "retmode": "xml"}
+    response = await client.post(f"{EUTILS_BASE_URL}/efetch.fcgi", data=data)
+    response.raise_for_status()
+    # Parsing a large article set is CPU-bound, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, parse_efetch_xml, response.content)
@@ -0,0 +1,155 @@
+import os
+import time
+import asyncio
+import threading
+
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from open_deep_research.key_pool import api_keys
+
+# Default limits per search provider: sustained requests per second, burst size and
+# the maximum number of requests in flight at once. These follow each provider's
+# documented limits and are shared by every section and run in the process.
+DEFAULT_RATE_LIMITS = {
+    "tavily": {"rate": 10.0, "burst": 10, "max_in_flight": 10},
+    "exa": {"rate": 5.0, "burst": 5, "max_in_flight": 5},            # 5 requests per second
+    "perplexity": {"rate": 50 / 60, "burst": 5, "max_in_flight": 5},  # 50 requests per minute for sonar-pro
+    "arxiv": {"rate": 1 / 3, "burst": 1, "max_in_flight": 1},         # 1 request every 3 seconds
+    "arxiv_pdf": {"rate": 4.0, "burst": 4, "max_in_flight": 4},      # PDF downloads from arxiv.org, 4 per second
+    "pubmed": {"rate": 3.0, "burst": 3, "max_in_flight": 3},         # NCBI E-utilities without an API key
+    "pubmed_keyed": {"rate": 10.0, "burst": 10, "max_in_flight": 10}, # NCBI E-utilities with an API key
+}
+DEFAULT_RATE_LIMIT = {"rate": 5.0, "burst": 5, "max_in_flight": 5}
+
+# How often a request waiting only on the in-flight cap re-checks for a free slot
+IN_FLIGHT_POLL_INTERVAL = 0.05
+
+
+class ProviderLimiter:
+    """
+    Token bucket plus in-flight cap for one provider.
+
+    State is guarded by a threading lock and waiting is done with asyncio.sleep, so a single
+    limiter can be shared by every coroutine in the process regardless of which event loop it runs on.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, max_in_flight: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        """ Take a token and an in-flight slot if both are available. Returns 0 on success, else seconds to wait. """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._in_flight >= self.max_in_flight:
+                return IN_FLIGHT_POLL_INTERVAL
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._in_flight += 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """ Wait until a request may be sent """
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self) -> None:
+        """ Free the in-flight slot taken by acquire """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def backoff(self, seconds: float) -> None:
+        """ Pause all new requests for this provider, e.g. after a 429 response """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class SearchScheduler:
+    """
+    Process-wide registry of per-provider limiters.
+
+    Every search backend wraps each outgoing request in `async with search_scheduler.limit(provider):`
+    so concurrent sections share one quota per provider instead of each applying its own delays.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None):
+        self._limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self._limiters: Dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _settings(self, provider: str) -> dict:
+        """ Default settings for a provider (scaled by its number of API keys), overridden by SEARCH_RATE_<PROVIDER>, SEARCH_BURST_<PROVIDER> and SEARCH_MAX_IN_FLIGHT_<PROVIDER> """
+        settings = dict(self._limits.get(provider, DEFAULT_RATE_LIMIT))
+        # Default limits are per API key, so a provider with a pool of keys gets proportionally more
+        keys = len(api_keys(provider))
+        if keys > 1:
+            settings = {"rate": settings["rate"] * keys, "burst": settings["burst"] * keys, "max_in_flight": settings["max_in_flight"] * keys}
+        suffix = provider.upper()
+        if f"SEARCH_RATE_{suffix}" in os.environ:
+            settings["rate"] = float(os.environ[f"SEARCH_RATE_{suffix}"])
+        if f"SEARCH_BURST_{suffix}" in os.environ:
+            settings["burst"] = int(os.environ[f"SEARCH_BURST_{suffix}"])
+        if f"SEARCH_MAX_IN_FLIGHT_{suffix}" in os.environ:
+            settings["max_in_flight"] = int(os.environ[f"SEARCH_MAX_IN_FLIGHT_{suffix}"])
+        return settings
+
+    def get_limiter(self, provider: str) -> ProviderLimiter:
+        """ Get the limiter for a provider, creating it on first use """
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(provider)
+                if limiter is None:
+                    limiter = ProviderLimiter(**self._settings(provider))
+                    self._limiters[provider] = limiter
+        return limiter
+
+    def configure(self, provider: str, rate: Optional[float] = None, burst: Optional[int] = None, max_in_flight: Optional[int] = None) -> None:
+        """
+        Changes the limits for a provider. Takes effect for requests acquired after the call.
+
+        Args:
+            provider (str): The provider identifier (e.g., "exa", "pubmed_keyed").
+            rate (float, optional): Sustained requests per second.
+            burst (int, optional): Number of requests that may be sent back to back.
+            max_in_flight (int, optional): Maximum number of concurrent requests.
+        """
+        settings = self._settings(provider)
+        for key, value in (("rate", rate), ("burst", burst), ("max_in_flight", max_in_flight)):
+            if value is not None:
+                settings[key] = value
+        with self._lock:
+            self._limits[provider] = settings
+            self._limiters[provider] = ProviderLimiter(**settings)
+
+    @asynccontextmanager
+    async def limit(self, provider: str):
+        """ Hold a rate-limit token and in-flight slot for the duration of one request """
+        limiter = self.get_limiter(provider)
+        await limiter.acquire()
+        try:
+            yield limiter
+        finally:
+            limiter.release()
+
+    def backoff(self, provider: str, seconds: float) -> None:
+        """ Pause all new requests to a provider for the given number of seconds """
+        self.get_limiter(provider).backoff(seconds)
+
+
+search_scheduler = SearchScheduler()
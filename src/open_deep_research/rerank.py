@@ -0,0 +1,55 @@
+import re
+
+import numpy as np
+
+from typing import List
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """ Lowercased word tokens """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def bm25_scores(query: str, documents: List[str]) -> np.ndarray:
+    """
+    Scores every document against a query with BM25 in one vectorized pass.
+
+    Term statistics come from the documents themselves, so scores are comparable across documents
+    from different search APIs regardless of their own score scales.
+
+    Args:
+        query (str): The query text, e.g. a section's name and description.
+        documents (List[str]): The texts to score.
+
+    Returns:
+        np.ndarray: One score per document, higher is more relevant.
+    """
+    query_terms = {term: i for i, term in enumerate(dict.fromkeys(tokenize(query)))}
+    if not documents or not query_terms:
+        return np.zeros(len(documents))
+
+    # Only occurrences of query terms are counted; every other token just adds to the document length
+    term_ids = []
+    doc_ids = []
+    doc_lengths = np.empty(len(documents))
+    for doc_id, document in enumerate(documents):
+        tokens = tokenize(document)
+        doc_lengths[doc_id] = len(tokens)
+        ids = [query_terms[token] for token in tokens if token in query_terms]
+        term_ids.extend(ids)
+        doc_ids.extend([doc_id] * len(ids))
+
+    num_terms = len(query_terms)
+    flat = np.asarray(doc_ids, dtype=np.int64) * num_terms + np.asarray(term_ids, dtype=np.int64)
+    tf = np.bincount(flat, minlength=len(documents) * num_terms).reshape(len(documents), num_terms).astype(float)
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+    avg_length = max(doc_lengths.mean(), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)
+    return ((tf * (BM25_K1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
@@ -0,0 +1,308 @@
+import os
+import re
+import time
+import logging
+import random
+import asyncio
+import threading
+
+import arxiv
+import httpx
+
+from email.utils import parsedate_to_datetime
+from tavily.errors import BadRequestError, ForbiddenError, InvalidAPIKeyError, UsageLimitExceededError, TimeoutError as TavilyTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Optional
+from open_deep_research.key_pool import KeyPool
+from open_deep_research.rate_limit import search_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Retry and circuit breaker settings per search provider (the same keys as the rate limiter):
+# attempts per request, backoff before the first retry and the longest backoff, failures in a row
+# that open the circuit and seconds it stays open before a trial request is let through.
+DEFAULT_RESILIENCE_POLICIES = {
+    "tavily": {"max_attempts": 3, "base_delay": 0.5, "max_delay": 8.0, "failure_threshold": 5, "reset_timeout": 30.0},
+    "exa": {"max_attempts": 3, "base_delay": 1.0, "max_delay": 8.0, "failure_threshold": 5, "reset_timeout": 30.0},
+    "perplexity": {"max_attempts": 3, "base_delay": 1.0, "max_delay": 15.0, "failure_threshold": 5, "reset_timeout": 60.0},
+    "arxiv": {"max_attempts": 3, "base_delay": 3.0, "max_delay": 30.0, "failure_threshold": 3, "reset_timeout": 120.0},  # Asks for 3s between requests
+    "arxiv_pdf": {"max_attempts": 2, "base_delay": 1.0, "max_delay": 8.0, "failure_threshold": 5, "reset_timeout": 60.0},
+    "pubmed": {"max_attempts": 4, "base_delay": 1.0, "max_delay": 10.0, "failure_threshold": 5, "reset_timeout": 30.0},
+    "pubmed_keyed": {"max_attempts": 4, "base_delay": 0.5, "max_delay": 10.0, "failure_threshold": 5, "reset_timeout": 30.0},
+}
+DEFAULT_RESILIENCE_POLICY = {"max_attempts": 3, "base_delay": 1.0, "max_delay": 10.0, "failure_threshold": 5, "reset_timeout": 30.0}
+
+# A Retry-After longer than this is not waited out; the request fails so hedging can move on to another provider
+MAX_RETRY_AFTER = 60.0
+# Pause applied to every request to a provider after a 429 without a Retry-After header
+DEFAULT_RATE_LIMIT_PAUSE = 1.0
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Failures that mean the provider can't be used at the moment, and so count towards opening its circuit
+PROVIDER_FAILURE_STATUS = RETRYABLE_STATUS | {401, 403}
+# Some clients (e.g. Exa) only report the status code in the exception message
+STATUS_MESSAGE_PATTERN = re.compile(r"status(?: code)?:?\s*(\d{3})\b", re.IGNORECASE)
+# Rate limit headers reporting how many requests a key has left
+REMAINING_REQUESTS_HEADERS = ("x-ratelimit-remaining-requests", "x-ratelimit-remaining", "anthropic-ratelimit-requests-remaining")
+# Tavily raises its own exceptions in place of the status code
+TAVILY_ERROR_STATUS = {UsageLimitExceededError: 429, ForbiddenError: 403, InvalidAPIKeyError: 401, BadRequestError: 400}
+
+
+class CircuitOpenError(Exception):
+    """ Raised without contacting a provider while its circuit is open """
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is failing, not sending requests for another {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def error_status(e: BaseException) -> Optional[int]:
+    """ HTTP status code behind an exception raised by a search client, if there is one """
+    response = getattr(e, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # arxiv.HTTPError
+        status = getattr(e, "status", None)
+    if status is None:
+        status = next((code for error_type, code in TAVILY_ERROR_STATUS.items() if isinstance(e, error_type)), None)
+    if status is None:
+        match = STATUS_MESSAGE_PATTERN.search(str(e))
+        if match:
+            status = int(match.group(1))
+        elif "Too Many Requests" in str(e):
+            status = 429
+    return status if isinstance(status, int) else None
+
+def retry_after(e: BaseException) -> Optional[float]:
+    """ Seconds to wait before retrying, from the Retry-After header of the response behind an exception """
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def remaining_requests(response: Any) -> Optional[int]:
+    """ Requests left in the current window, from the rate limit headers of a response, if it has them """
+    headers = getattr(response, "headers", None)
+    if headers is None or not hasattr(headers, "get"):
+        return None
+    for header in REMAINING_REQUESTS_HEADERS:
+        value = headers.get(header)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                return None
+    return None
+
+def is_retryable(e: BaseException) -> bool:
+    """ Whether a request that raised e may succeed if sent again: timeouts, dropped connections, 429 and 5xx responses """
+    status = error_status(e)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    # requests' exceptions are OSErrors too
+    return isinstance(e, (httpx.TransportError, asyncio.TimeoutError, TimeoutError, TavilyTimeoutError, OSError, arxiv.UnexpectedEmptyPageError))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one provider.
+
+    After failure_threshold failures in a row the circuit opens and requests fail immediately. Once
+    reset_timeout seconds have passed, one trial request is let through: success closes the circuit,
+    failure opens it again. Guarded by a threading lock, like ProviderLimiter, so one breaker is
+    shared by every event loop in the process.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> float:
+        """ Claim permission to send a request. Returns 0 if allowed, else the seconds until the circuit half-opens. """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                return max(remaining, 0.0) or self.reset_timeout
+            self._trial_in_flight = True
+            return 0.0
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """ Count a failed request. Returns True if this failure opened the circuit. """
+        with self._lock:
+            self._failures += 1
+            was_trial = self._trial_in_flight
+            self._trial_in_flight = False
+            if was_trial or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def release_trial(self) -> None:
+        """ Let another trial through if the current one ended without a verdict, e.g. it was cancelled """
+        with self._lock:
+            self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+
+class SearchResilience:
+    """
+    Process-wide retries and circuit breakers for search providers.
+
+    Every search backend sends each provider request through `await search_resilience.call(provider, request)`.
+    Failed requests that may succeed later are retried with full-jitter exponential backoff, waiting at
+    least as long as the provider's Retry-After header. 429 responses also pause the provider in the
+    shared rate limiter, so every section backs off together. A provider that keeps failing has its circuit
+    opened and is not contacted until the reset timeout, so hedged searches move on to another provider at once.
+    Providers with several API keys rotate to another key on a 429 instead of waiting.
+    Retries, failures and trips are counted per provider and can be read with metrics().
+    """
+
+    def __init__(self, policies: Optional[Dict[str, dict]] = None):
+        self._policies = {**DEFAULT_RESILIENCE_POLICIES, **(policies or {})}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, provider: str) -> dict:
+        """ Default policy for a provider, overridden by SEARCH_MAX_ATTEMPTS_<PROVIDER>, SEARCH_BREAKER_THRESHOLD_<PROVIDER> and SEARCH_BREAKER_RESET_<PROVIDER> """
+        policy = dict(self._policies.get(provider, DEFAULT_RESILIENCE_POLICY))
+        suffix = provider.upper()
+        if f"SEARCH_MAX_ATTEMPTS_{suffix}" in os.environ:
+            policy["max_attempts"] = int(os.environ[f"SEARCH_MAX_ATTEMPTS_{suffix}"])
+        if f"SEARCH_BREAKER_THRESHOLD_{suffix}" in os.environ:
+            policy["failure_threshold"] = int(os.environ[f"SEARCH_BREAKER_THRESHOLD_{suffix}"])
+        if f"SEARCH_BREAKER_RESET_{suffix}" in os.environ:
+            policy["reset_timeout"] = float(os.environ[f"SEARCH_BREAKER_RESET_{suffix}"])
+        return policy
+
+    def get_breaker(self, provider: str) -> CircuitBreaker:
+        """ Get the circuit breaker for a provider, creating it on first use """
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(provider)
+                if breaker is None:
+                    policy = self.policy(provider)
+                    breaker = CircuitBreaker(policy["failure_threshold"], policy["reset_timeout"])
+                    self._breakers[provider] = breaker
+        return breaker
+
+    def _count(self, provider: str, metric: str) -> None:
+        with self._lock:
+            counts = self._metrics.setdefault(provider, {"requests": 0, "retries": 0, "failures": 0, "circuit_trips": 0, "short_circuits": 0})
+            counts[metric] += 1
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """ Requests, retries, failed requests, circuit trips and requests refused by an open circuit, per provider """
+        with self._lock:
+            return {provider: dict(counts) for provider, counts in self._metrics.items()}
+
+    def reset(self) -> None:
+        """ Close every circuit and clear the metrics """
+        with self._lock:
+            self._breakers.clear()
+            self._metrics.clear()
+
+    async def call(self, provider: str, request: Callable[..., Awaitable[Any]], key_pool: Optional[KeyPool] = None) -> Any:
+        """
+        Sends a request to a provider with retries, behind the provider's circuit breaker.
+
+        Args:
+            provider (str): The provider identifier (e.g., "exa", "pubmed_keyed").
+            request (Callable[..., Awaitable]): Makes one attempt; called again for every retry. It should
+                hold the provider's rate limit itself, so retries wait their turn like any other request.
+                Called with the API key to use if key_pool is given.
+            key_pool (KeyPool, optional): API keys to lease one from per attempt. A key that is rate limited
+                or rejected is taken out of rotation and the request is retried right away with another key.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open.
+            Exception: The last attempt's exception, if it wasn't retryable or every attempt failed.
+        """
+        policy = self.policy(provider)
+        breaker = self.get_breaker(provider)
+        # With several keys, every key gets a chance before the request gives up
+        max_attempts = max(1, policy["max_attempts"], len(key_pool) if key_pool is not None else 0)
+        for attempt in range(max_attempts):
+            wait = breaker.before_request()
+            if wait > 0:
+                self._count(provider, "short_circuits")
+                raise CircuitOpenError(provider, wait)
+
+            self._count(provider, "requests")
+            api_key = key_pool.acquire() if key_pool is not None else None
+            try:
+                result = await (request(api_key) if key_pool is not None else request())
+            except asyncio.CancelledError:
+                if key_pool is not None:
+                    key_pool.release(api_key)
+                breaker.release_trial()
+                raise
+            except Exception as e:
+                status = error_status(e)
+                retryable = is_retryable(e)
+                self._count(provider, "failures")
+                delay = retry_after(e)
+
+                # A rate limited or rejected key is swapped for another one instead of waiting
+                rotated = False
+                if key_pool is not None:
+                    key_pool.release(api_key, status=status, retry_after=delay)
+                    rotated = status in (401, 403, 429) and key_pool.available() > 0
+                if status == 429 and not rotated:
+                    # Pause every pending request to this provider, not just this one
+                    search_scheduler.backoff(provider, min(delay if delay is not None else DEFAULT_RATE_LIMIT_PAUSE, MAX_RETRY_AFTER))
+
+                if not (retryable or rotated) or attempt + 1 >= max_attempts or (not rotated and delay is not None and delay > MAX_RETRY_AFTER):
+                    # Only requests that fail for good count against the circuit, and only if the provider is to blame
+                    if retryable or status in PROVIDER_FAILURE_STATUS:
+                        if breaker.record_failure():
+                            self._count(provider, "circuit_trips")
+                            logger.warning("Circuit opened for %s after repeated failures, pausing it for %.0fs: %s", provider, breaker.reset_timeout, e)
+                    else:
+                        breaker.release_trial()
+                    raise
+
+                breaker.release_trial()
+                if rotated:
+                    delay = 0.0
+                else:
+                    backoff = random.uniform(0, min(policy["max_delay"], policy["base_delay"] * 2 ** attempt))
+                    delay = max(backoff, delay or 0.0)
+                logger.info("%s request failed (%s), retrying in %.1fs%s", provider, str(e) or type(e).__name__, delay, " with another API key" if rotated else "")
+                self._count(provider, "retries")
+                await asyncio.sleep(delay)
+            else:
+                if key_pool is not None:
+                    key_pool.release(api_key, remaining=remaining_requests(result))
+                breaker.record_success()
+                return result
+
+search_resilience = SearchResilience()
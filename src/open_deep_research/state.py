@@ -1,4 +1,5 @@
-from typing import Annotated, List, TypedDict, Literal
+from collections.abc import Mapping
+from typing import Annotated, Callable, List, Optional, TypedDict, Literal, Union
 from pydantic import BaseModel, Field
 import operator
 
@@ -37,17 +38,141 @@ class Feedback(BaseModel):
         description="List of follow-up search queries.",
     )
 
+class SearchResult(Mapping):
+    """
+    One search result, stored in slots rather than a per-result dict.
+
+    Reads like the result dicts the backends produce (result['url'], result.get('raw_content')), so
+    existing consumers work unchanged. raw_content may be given as a zero-argument callable, which is
+    only called (once) when the content is first read. When raw_content was trimmed at ingestion and the
+    untrimmed text was kept on disk, full_text_id is its digest in the text store.
+    """
+    __slots__ = ("title", "url", "content", "score", "_raw_content", "full_text_id")
+    _fields = ("title", "url", "content", "score", "raw_content", "full_text_id")
+
+    def __init__(self, title: str, url: str, content: str, score: float = 0.0,
+                 raw_content: Union[str, None, Callable[[], Optional[str]]] = None, full_text_id: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.content = content
+        self.score = score
+        self._raw_content = raw_content
+        self.full_text_id = full_text_id
+
+    @property
+    def raw_content(self) -> Optional[str]:
+        if callable(self._raw_content):
+            self._raw_content = self._raw_content()
+        return self._raw_content
+
+    @raw_content.setter
+    def raw_content(self, value: Union[str, None, Callable[[], Optional[str]]]) -> None:
+        self._raw_content = value
+
+    def with_score(self, score: float) -> "SearchResult":
+        """ A copy of the result with a different score. Field values are shared, not copied. """
+        return SearchResult(self.title, self.url, self.content, score, self._raw_content, self.full_text_id)
+
+    def trim_raw_content(self, max_chars: int) -> Optional[str]:
+        """
+        Cuts raw_content down to max_chars characters. A raw_content that hasn't been loaded yet is left alone.
+
+        Returns:
+            Optional[str]: The untrimmed text if it was cut, otherwise None.
+        """
+        if isinstance(self._raw_content, str) and len(self._raw_content) > max_chars:
+            full_text = self._raw_content
+            self._raw_content = full_text[:max_chars]
+            return full_text
+        return None
+
+    @classmethod
+    def from_dict(cls, result: dict) -> "SearchResult":
+        if isinstance(result, cls):
+            return result
+        return cls(result.get("title") or "", result.get("url") or "", result.get("content") or "",
+                   result.get("score") or 0.0, result.get("raw_content"), result.get("full_text_id"))
+
+    def to_dict(self) -> dict:
+        return {field: self[field] for field in self._fields}
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"SearchResult(title={self.title!r}, url={self.url!r})"
+
+class SearchResponse(Mapping):
+    """
+    The results of one search query, stored in slots rather than a per-query dict.
+
+    Reads like a Tavily-shaped response dict. The follow_up_questions, answer and images keys are
+    not used by the graph, so they are not stored and always read as None, None and [].
+    The 'error' key is only present for failed searches.
+    """
+    __slots__ = ("query", "results", "error")
+    _fields = ("query", "follow_up_questions", "answer", "images", "results")
+
+    def __init__(self, query: str, results: Optional[List[SearchResult]] = None, error: Optional[str] = None):
+        self.query = query
+        self.results = results if results is not None else []
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, response: dict) -> "SearchResponse":
+        if isinstance(response, cls):
+            return response
+        results = [SearchResult.from_dict(result) for result in response.get("results") or []]
+        return cls(response.get("query") or "", results, response.get("error"))
+
+    def with_query(self, query: str) -> "SearchResponse":
+        """ The same response answering a differently spelled query. Results are shared, not copied. """
+        return SearchResponse(query, self.results, self.error)
+
+    def to_dict(self) -> dict:
+        response = dict(self)
+        response["results"] = [result.to_dict() for result in self.results]
+        return response
+
+    def __getitem__(self, key):
+        if key in ("query", "results") or (key == "error" and self.error is not None):
+            return getattr(self, key)
+        if key in ("follow_up_questions", "answer"):
+            return None
+        if key == "images":
+            return []
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields + ("error",) if self.error is not None else self._fields)
+
+    def __len__(self):
+        return len(self._fields) + (self.error is not None)
+
+    def __repr__(self):
+        return f"SearchResponse(query={self.query!r}, results={len(self.results)}, error={self.error!r})"
+
 class ReportStateInput(TypedDict):
     topic: str # Report topic
     
 class ReportStateOutput(TypedDict):
     final_report: str # Final report
+    duplicate_tokens_removed: int # Source tokens dropped as duplicate or near-duplicate sources, summed over all sections
 
 class ReportState(TypedDict):
     topic: str # Report topic    
     feedback_on_report_plan: str # Feedback on the report plan
     sections: list[Section] # List of report sections 
     completed_sections: Annotated[list, operator.add] # Send() API key
+    duplicate_tokens_removed: Annotated[int, operator.add] # Source tokens dropped as duplicates, summed over all sections
     report_sections_from_research: str # String of any completed sections from research to write final sections
     final_report: str # Final report
 
@@ -57,8 +182,12 @@ class SectionState(TypedDict):
     search_iterations: int # Number of search iterations done
     search_queries: list[SearchQuery] # List of search queries
     source_str: str # String of formatted source content from web search
+    source_store: dict[str, dict] # Sources already sent to the writer in this section, keyed by canonical URL
+    cited_sources_str: str # Titles and URLs of the sources sent to the writer in earlier iterations
+    duplicate_tokens_removed: int # Source tokens dropped as duplicate or near-duplicate sources in this section
     report_sections_from_research: str # String of any completed sections from research to write final sections
     completed_sections: list[Section] # Final key we duplicate in outer state for Send() API
 
 class SectionOutputState(TypedDict):
     completed_sections: list[Section] # Final key we duplicate in outer state for Send() API
+    duplicate_tokens_removed: int # Source tokens dropped as duplicates in this section, added to the report's total
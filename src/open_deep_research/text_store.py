@@ -0,0 +1,129 @@
+import os
+import mmap
+import hashlib
+import threading
+
+from typing import Optional
+from open_deep_research.cache import get_cache_dir
+
+# Total size of stored texts before the least recently used ones are deleted
+DEFAULT_TEXT_STORE_MAX_BYTES = 1024 * 1024 * 1024
+# Eviction frees space down to this fraction of the cap, so it doesn't run again on every write
+EVICT_TO_FRACTION = 0.9
+
+class TextStore:
+    """
+    Content-addressed on-disk store for full page texts that were trimmed at ingestion.
+
+    Each text is written once under its sha256 digest, so identical pages fetched by different
+    sections or runs share one file. Reads memory-map the file and decode only the requested prefix,
+    so nothing is loaded into memory until a caller actually needs the text. Once the stored texts
+    exceed max_bytes, the least recently written or read ones are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_TEXT_STORE_MAX_BYTES):
+        self.directory = directory or os.path.join(get_cache_dir(), "full_text")
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Total bytes stored, counted from disk on the first write
+        self._size: Optional[int] = None
+
+    def _path(self, digest: str) -> str:
+        # Fan out over subdirectories so no single directory grows too large
+        return os.path.join(self.directory, digest[:2], f"{digest}.txt")
+
+    def _files(self):
+        """ Stored text files, across all subdirectories """
+        for subdirectory in os.scandir(self.directory):
+            if subdirectory.is_dir():
+                for entry in os.scandir(subdirectory.path):
+                    if entry.name.endswith(".txt"):
+                        yield entry
+
+    def _evict(self) -> None:
+        """ Deletes the least recently used texts until the store is back under its cap """
+        files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._files()))
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self._size <= self.max_bytes * EVICT_TO_FRACTION:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+    def put(self, text: str) -> str:
+        """
+        Stores a text, written atomically so concurrent runs never read a partial file.
+
+        Returns:
+            str: The text's digest, used to read it back.
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                if self._size is None:
+                    self._size = sum(entry.stat().st_size for entry in self._files())
+                else:
+                    self._size += len(data)
+                if self._size > self.max_bytes:
+                    self._evict()
+        else:
+            # Mark the text as recently used, so it is evicted last
+            self._touch(path)
+        return digest
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, digest: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Reads a stored text, or only its first max_chars characters.
+
+        Returns:
+            Optional[str]: The text, or None if nothing is stored under the digest.
+        """
+        try:
+            file = open(self._path(digest), "rb")
+        except FileNotFoundError:
+            return None
+        self._touch(self._path(digest))
+        with file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # A UTF-8 character is at most 4 bytes, so this prefix always covers max_chars characters
+                data = mapped[:] if max_chars is None else mapped[:max_chars * 4]
+        text = data.decode("utf-8", errors="ignore")
+        return text if max_chars is None else text[:max_chars]
+
+
+_text_store: Optional[TextStore] = None
+_text_store_lock = threading.Lock()
+
+def get_text_store() -> TextStore:
+    """
+    Shared store of full texts, in the full_text directory of the cache dir.
+
+    Configured through environment variables:
+        SEARCH_RAW_CONTENT_SPILL_MAX_BYTES: Total size of stored texts before the least recently used are deleted.
+    """
+    global _text_store
+    if _text_store is None:
+        with _text_store_lock:
+            if _text_store is None:
+                _text_store = TextStore(max_bytes=int(os.environ.get("SEARCH_RAW_CONTENT_SPILL_MAX_BYTES", DEFAULT_TEXT_STORE_MAX_BYTES)))
+    return _text_store
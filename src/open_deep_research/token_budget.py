@@ -0,0 +1,89 @@
+import logging
+import functools
+
+import numpy as np
+import tiktoken
+
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Encoding used for models tiktoken doesn't know (e.g. Anthropic, Groq or DeepSeek models). Counts for
+# those are an approximation, but far closer than a flat characters-per-token guess.
+DEFAULT_ENCODING = "o200k_base"
+
+# Characters per token assumed when no tokenizer can be loaded, as in deduplicate_and_format_sources
+CHARS_PER_TOKEN = 4
+
+# Sources with no relevance score still get this weight, so they are shortened rather than dropped
+MIN_SOURCE_WEIGHT = 0.05
+
+
+class TokenCounter:
+    """ Counts and truncates text in the tokens of one encoding, or estimates them if no encoding is available """
+
+    def __init__(self, encoding: Optional["tiktoken.Encoding"] = None):
+        self.encoding = encoding
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """ Token counts of several texts, encoded in one batch across threads """
+        if self.encoding is None:
+            return [-(-len(text) // CHARS_PER_TOKEN) for text in texts]
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """ The longest prefix of text that is at most max_tokens tokens """
+        if self.encoding is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        # Only encode what could fit; no token is longer than a few dozen characters in practice
+        tokens = self.encoding.encode_ordinary(text[:max_tokens * 32])
+        if len(tokens) <= max_tokens and len(text) <= max_tokens * 32:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+@functools.lru_cache(maxsize=32)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """
+    Cached token counter for a model.
+
+    Uses the model's own tiktoken encoding when tiktoken knows it, DEFAULT_ENCODING otherwise, and falls
+    back to estimating from the character count when the encoding can't be loaded (e.g. offline).
+    """
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        encoding_name = DEFAULT_ENCODING
+    try:
+        return TokenCounter(tiktoken.get_encoding(encoding_name))
+    except Exception as e:
+        logger.warning("Could not load tokenizer %s for %s, estimating tokens from characters instead: %s", encoding_name, model_name, e)
+        return TokenCounter()
+
+def allocate_token_budget(sizes: List[int], weights: List[float], budget: int) -> List[int]:
+    """
+    Splits a token budget across sources in proportion to their weights.
+
+    No source gets more than its own size, and whatever a short source doesn't use is handed on to the
+    others, again by weight, until the budget or the sources run out.
+
+    Args:
+        sizes (List[int]): Tokens each source would take in full.
+        weights (List[float]): Relevance of each source. Values below MIN_SOURCE_WEIGHT are raised to it.
+        budget (int): Total tokens to hand out.
+
+    Returns:
+        List[int]: Tokens allotted to each source.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    weights = np.maximum(np.nan_to_num(np.asarray(weights, dtype=float)), MIN_SOURCE_WEIGHT)
+    allocation = np.zeros(len(sizes))
+    remaining = float(budget)
+    active = sizes > 0
+    # Every round either fills at least one source or hands out the whole remainder
+    while remaining >= 1 and active.any():
+        share = remaining * weights[active] / weights[active].sum()
+        given = np.minimum(share, sizes[active] - allocation[active])
+        allocation[active] += given
+        remaining -= given.sum()
+        active &= allocation < sizes
+    return np.floor(allocation).astype(int).tolist()
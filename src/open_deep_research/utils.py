@@ -1,19 +1,75 @@
 
 import os
+import re
+import time
+import logging
 import asyncio
-import requests
+import functools
+import threading
 
-from tavily import TavilyClient, AsyncTavilyClient
-from langchain_community.retrievers import ArxivRetriever
-from langchain_community.utilities.pubmed import PubMedAPIWrapper
-from exa_py import Exa
+import arxiv
+import numpy as np
+
+from collections import deque
 from typing import List, Optional, Dict, Any
-from open_deep_research.state import Section
+from open_deep_research.state import Section, SearchResult, SearchResponse
+from open_deep_research.cache import get_search_cache, make_search_key, search_flight
+from open_deep_research.local_search import get_local_index
+from open_deep_research.text_store import get_text_store
+from open_deep_research.boilerplate import clean_page_text
+from open_deep_research.content_store import canonicalize_url, get_content_store
+from open_deep_research.dedup import find_near_duplicates
+from open_deep_research.rerank import bm25_scores
+from open_deep_research.token_budget import allocate_token_budget, get_token_counter
+from open_deep_research.clients import get_tavily_async_client, get_exa_client, get_perplexity_client, get_arxiv_client, get_arxiv_http_client, get_pubmed_client
+from open_deep_research.pubmed import esearch, efetch
+from open_deep_research.page_fetch import get_page_fetcher
+from open_deep_research.pdf_extract import extract_pdf_text_async, get_extracted_text_cache
+from open_deep_research.rate_limit import search_scheduler
+from open_deep_research.resilience import error_status, retry_after, search_resilience
+from open_deep_research.key_pool import get_key_pool
 from langsmith import traceable
 
-tavily_client = TavilyClient()
-tavily_async_client = AsyncTavilyClient()
+logger = logging.getLogger(__name__)
+
+
+async def ainvoke_with_key_pool(provider: str, build_model, messages):
+    """
+    Invokes a chat model asynchronously, spreading calls across the provider's API keys.
+
+    With several keys in <PROVIDER>_API_KEYS (e.g. ANTHROPIC_API_KEYS), the model is built with the
+    key that has the most quota left. A key that is rate limited or rejected is taken out of rotation
+    and the call is repeated with another key. With a single key, the model is built as usual.
+    Cancelling the call cancels the request and hands its key back.
+
+    Args:
+        provider (str): The model provider, e.g. "anthropic" or "openai".
+        build_model (Callable): Builds the runnable to invoke. Called with api_key=... when a key is leased.
+        messages (list): Messages to invoke the model with.
+
+    Returns:
+        The model's response.
+    """
+    key_pool = get_key_pool(provider)
+    if key_pool is None or len(key_pool) < 2:
+        return await build_model().ainvoke(messages)
 
+    for attempt in range(len(key_pool)):
+        api_key = key_pool.acquire()
+        try:
+            response = await build_model(api_key=api_key).ainvoke(messages)
+        except asyncio.CancelledError:
+            key_pool.release(api_key)
+            raise
+        except Exception as e:
+            status = error_status(e)
+            key_pool.release(api_key, status=status, retry_after=retry_after(e))
+            if status not in (401, 403, 429) or not key_pool.available() or attempt + 1 == len(key_pool):
+                raise
+            logger.info("%s request failed (%s), retrying with another API key", provider, e)
+        else:
+            key_pool.release(api_key)
+            return response
 
 def get_config_value(value):
     """
@@ -21,6 +77,20 @@ def get_config_value(value):
     """
     return value if isinstance(value, str) else value.value
 
+def get_search_apis(search_api, search_api_hedge=None) -> List[str]:
+    """
+    Helper function to build the ordered list of search APIs: the configured search API followed by
+    any hedge search APIs (given as a list or a comma-separated string), without repeats
+    """
+    if isinstance(search_api_hedge, str):
+        search_api_hedge = [api.strip() for api in search_api_hedge.split(",") if api.strip()]
+    search_apis = [get_config_value(search_api)]
+    for api in search_api_hedge or []:
+        api = get_config_value(api)
+        if api not in search_apis:
+            search_apis.append(api)
+    return search_apis
+
 # Helper function to get search parameters based on the search API and config
 def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -38,8 +108,9 @@ def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any
         "exa": ["max_characters", "num_results", "include_domains", "exclude_domains", "subpages"],
         "tavily": [],  # Tavily currently accepts no additional parameters
         "perplexity": [],  # Perplexity accepts no additional parameters
-        "arxiv": ["load_max_docs", "get_full_documents", "load_all_available_meta"],
+        "arxiv": ["load_max_docs", "get_full_documents", "load_all_available_meta", "full_text_chars_max"],
         "pubmed": ["top_k_results", "email", "api_key", "doc_content_chars_max"],
+        "local": ["corpus_dir", "index_path", "max_results"],
     }
 
     # Get the list of accepted parameters for the given search API
@@ -52,10 +123,220 @@ def get_search_params(search_api: str, search_api_config: Optional[Dict[str, Any
     # Filter the config to only include accepted parameters
     return {k: v for k, v in search_api_config.items() if k in accepted_params}
 
+class LatencyTracker:
+    """ Rolling window of observed request latencies per search provider """
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float) -> None:
+        """ Record one observed latency """
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, provider: str, percentile: float, default: float, min_samples: int = 10) -> float:
+        """ Latency at the given percentile (0-1), or default until enough samples have been seen """
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < min_samples:
+            return default
+        index = min(len(samples) - 1, int(percentile * len(samples)))
+        return samples[index]
+
+search_latency = LatencyTracker()
+
+# Default for SEARCH_RAW_CONTENT_MAX_CHARS. Kept above the largest per-source budget search_web formats
+# (5000 tokens, about 20k characters), so trimming at ingestion never changes what the writer sees.
+DEFAULT_RAW_CONTENT_MAX_CHARS = 32_000
+
+def trim_search_responses(responses: List[SearchResponse], clean: bool = False) -> None:
+    """
+    Cleans and trims raw_content of every result in place, as soon as a backend's responses are normalized.
+    content is cut to the same length, since some backends (e.g. Exa) put the full page text in it as well.
+
+    Args:
+        responses (List[SearchResponse]): Freshly fetched responses.
+        clean (bool): Strip boilerplate, markup and repeated lines from web pages before trimming,
+            so the budget is spent on the page's actual text.
+
+    Configured through environment variables:
+        SEARCH_RAW_CONTENT_CLEAN: Set to "false" to skip boilerplate stripping.
+        SEARCH_RAW_CONTENT_MAX_CHARS: Characters of raw_content and content kept per result. 0 disables trimming.
+        SEARCH_RAW_CONTENT_SPILL: Set to "true" to keep the untrimmed text in the on-disk text store.
+            Its digest is recorded as the result's full_text_id.
+    """
+    clean = clean and os.environ.get("SEARCH_RAW_CONTENT_CLEAN", "").lower() not in ("0", "false", "no")
+    max_chars = int(os.environ.get("SEARCH_RAW_CONTENT_MAX_CHARS", DEFAULT_RAW_CONTENT_MAX_CHARS))
+    spill = os.environ.get("SEARCH_RAW_CONTENT_SPILL", "").lower() in ("1", "true", "yes")
+    for response in responses:
+        for result in response.results:
+            if clean and result.raw_content:
+                result.raw_content = clean_page_text(result.raw_content)
+            if max_chars <= 0:
+                continue
+            if len(result.content) > max_chars:
+                result.content = result.content[:max_chars]
+            full_text = result.trim_raw_content(max_chars)
+            if full_text is not None and spill:
+                result.full_text_id = get_text_store().put(full_text)
+
+def share_page_content(responses: List[SearchResponse]) -> None:
+    """
+    Reconciles results with the shared page content store, in place.
+
+    Results without raw_content get the stored text of their page if it is still fresh. Results with
+    raw_content refresh the store, and results for the same page share one copy of its text. Only called
+    for backends whose raw_content is the page's own text (see share_content on search_backend).
+    """
+    store = get_content_store()
+    if store is None:
+        return
+    results = [result for response in responses for result in response.results if result.url]
+    stored = store.get_many([result.url for result in results])
+
+    texts = {}
+    to_store = {}
+    for result in results:
+        url = canonicalize_url(result.url)
+        raw_content = result.raw_content
+        if raw_content:
+            if texts.get(url) == raw_content:
+                result.raw_content = texts[url]
+                continue
+            texts[url] = raw_content
+            if url not in stored or stored[url]["text"] != raw_content:
+                to_store[url] = (result.title, raw_content)
+        elif url in texts:
+            result.raw_content = texts[url]
+        elif url in stored:
+            result.raw_content = texts[url] = stored[url]["text"]
+    store.set_many(to_store)
+
+def _find_missing_queries(keys, search_queries, cached):
+    """ Map each distinct cache key that has no cached response to the query that produced it """
+    missing = {}
+    for query, key in zip(search_queries, keys):
+        if key not in cached and key not in missing:
+            missing[key] = query
+    return missing
+
+def _assemble_responses(search_queries, keys, responses):
+    """ Return one response per requested query, in order, echoing the caller's query string """
+    return [responses[key].with_query(query) for query, key in zip(search_queries, keys)]
+
+def search_backend(provider: str, clean_raw_content: bool = False, share_content: bool = False):
+    """
+    Decorator for search backends that take a list of queries and return one Tavily-shaped response per query.
+    The wrapped function returns SearchResponse records, which read like the backend's response dicts.
+
+    Each query is looked up in the shared on-disk search cache, keyed by provider, normalized query and the
+    filtered parameters from get_search_params. Misses that are already being fetched by a concurrent call
+    (e.g. another section searching the same thing) join that in-flight request. Only the remaining misses
+    are sent to the wrapped backend (once per distinct query), and successful responses (those without
+    an 'error' key) are written back to the cache.
+
+    Args:
+        provider (str): The search API identifier (e.g., "exa", "tavily"), used for the cache key and TTL.
+        clean_raw_content (bool): Strip boilerplate from raw_content. Meant for web pages; PDF text and
+            abstracts are left as they are.
+        share_content (bool): Reconcile results with the shared page content store. Only for backends whose
+            raw_content is the text of the page at the result's URL; generated answers and summaries are
+            specific to a query and must never be stored as page text.
+    """
+    def decorator(search_fn):
+        async def fetch(missing, kwargs):
+            # Only provider round-trips are timed, so cache hits don't skew the hedging delay
+            start = time.monotonic()
+            search_docs = await search_fn(list(missing.values()), **kwargs)
+            search_latency.record(provider, time.monotonic() - start)
+
+            # Trim raw content before the full pages are cached, traced or handed to the graph,
+            # then fill in or share page text through the URL-level content store if the backend returns page text
+            fresh = {key: SearchResponse.from_dict(response) for key, response in zip(missing, search_docs)}
+            del search_docs
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, trim_search_responses, list(fresh.values()), clean_raw_content)
+            if share_content:
+                await loop.run_in_executor(None, share_page_content, list(fresh.values()))
+
+            cache = get_search_cache()
+            if cache is not None:
+                # SQLite calls are run in the default executor to keep the event loop free
+                to_store = {key: response.to_dict() for key, response in fresh.items() if not response.error}
+                await loop.run_in_executor(None, cache.set_many, provider, to_store)
+            return fresh
+
+        @functools.wraps(search_fn)
+        async def wrapper(search_queries, **kwargs):
+            keys = [make_search_key(provider, query, kwargs) for query in search_queries]
+
+            cache = get_search_cache()
+            responses = {}
+            if cache is not None:
+                cached = await asyncio.get_running_loop().run_in_executor(None, cache.get_many, keys)
+                responses = {key: SearchResponse.from_dict(response) for key, response in cached.items()}
+
+            missing = _find_missing_queries(keys, search_queries, responses)
+            if missing:
+                responses.update(await search_flight.run(provider, missing, lambda owned: fetch(owned, kwargs)))
+
+            return _assemble_responses(search_queries, keys, responses)
+
+        return wrapper
+
+    return decorator
+
+def iter_formatted_sources(search_response, max_tokens_per_source, include_raw_content=True):
+    """
+    Yields the formatted, deduplicated sources as a stream of string chunks.
+    Joining the chunks gives the same text as deduplicate_and_format_sources (before stripping), so callers
+    can stream sources into a prompt or file without building intermediate strings.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        max_tokens_per_source: int
+        include_raw_content: bool
+
+    Yields:
+        str: Chunks of the formatted sources text
+    """
+    # Deduplicate by URL, keeping the last occurrence of each URL at the position of its first
+    unique_sources = {}
+    for response in search_response:
+        for source in response['results']:
+            unique_sources[source['url']] = source
+
+    # Using rough estimate of 4 characters per token
+    char_limit = max_tokens_per_source * 4
+    missing_raw_content = 0
+
+    yield "Sources:\n\n"
+    for source in unique_sources.values():
+        yield f"Source {source['title']}:\n===\nURL: {source['url']}\n===\nMost relevant content from source: {source['content']}\n===\n"
+        if include_raw_content:
+            # Handle None raw_content
+            raw_content = source.get('raw_content', '')
+            if raw_content is None:
+                raw_content = ''
+                missing_raw_content += 1
+            yield f"Full source content limited to {max_tokens_per_source} tokens: "
+            if len(raw_content) > char_limit:
+                yield raw_content[:char_limit]
+                yield "... [truncated]"
+            else:
+                yield raw_content
+            yield "\n\n"
+
+    if missing_raw_content:
+        print(f"Warning: No raw_content found for {missing_raw_content} of {len(unique_sources)} sources")
+
 def deduplicate_and_format_sources(search_response, max_tokens_per_source, include_raw_content=True):
     """
     Takes a list of search responses and formats them into a readable string.
     Limits the raw_content to approximately max_tokens_per_source.
+    The text is built from iter_formatted_sources with a single final join.
  
     Args:
         search_responses: List of search response dicts, each containing:
@@ -72,33 +353,275 @@ def deduplicate_and_format_sources(search_response, max_tokens_per_source, inclu
     Returns:
         str: Formatted string with deduplicated sources
     """
-     # Collect all results
-    sources_list = []
+    return _join_chunks(list(iter_formatted_sources(search_response, max_tokens_per_source, include_raw_content)))
+
+def _join_chunks(chunks: List[str]) -> str:
+    """ Join formatted chunks, stripping trailing whitespace on the last chunks instead of copying the whole joined text again """
+    while chunks and (not chunks[-1] or chunks[-1].isspace()):
+        chunks.pop()
+    if chunks:
+        chunks[-1] = chunks[-1].rstrip()
+    return "".join(chunks)
+
+def format_sources_within_budget(search_response, token_budget, model_name, include_raw_content=True):
+    """
+    Formats deduplicated sources like deduplicate_and_format_sources, but fits them into a total token budget.
+
+    Token counts come from the tokenizer of the model that will read the sources. Sources are taken in
+    order while their title and URL still fit; the budget left after those goes to the snippets first and
+    then to the raw content, each split across the sources in proportion to their score (e.g. the
+    relevance set by rerank_sources), so short sources only take what they need and relevant long
+    sources keep more of their text.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        token_budget (int): Total tokens for the formatted sources
+        model_name (str): Model whose tokenizer is used for counting
+        include_raw_content (bool): Whether to include raw content
+
+    Returns:
+        tuple[str, dict]: Formatted string with deduplicated sources, and the tokens each included
+            source was given, keyed by its URL
+    """
+    unique_sources = {}
     for response in search_response:
-        sources_list.extend(response['results'])
-    
-    # Deduplicate by URL
-    unique_sources = {source['url']: source for source in sources_list}
-
-    # Format output
-    formatted_text = "Sources:\n\n"
-    for i, source in enumerate(unique_sources.values(), 1):
-        formatted_text += f"Source {source['title']}:\n===\n"
-        formatted_text += f"URL: {source['url']}\n===\n"
-        formatted_text += f"Most relevant content from source: {source['content']}\n===\n"
+        for source in response['results']:
+            unique_sources[source['url']] = source
+    sources = list(unique_sources.values())
+
+    counter = get_token_counter(model_name)
+    headers = [f"Source {source['title']}:\n===\nURL: {source['url']}\n===\n" for source in sources]
+    header_tokens = counter.count_many(headers)
+    # Sources whose title and URL no longer fit are left out
+    kept = 0
+    remaining = token_budget
+    while kept < len(sources) and header_tokens[kept] <= remaining:
+        remaining -= header_tokens[kept]
+        kept += 1
+    if kept < len(sources):
+        logger.warning("Left out %d of %d sources that did not fit in %d tokens", len(sources) - kept, len(sources), token_budget)
+    sources, headers, header_tokens = sources[:kept], headers[:kept], header_tokens[:kept]
+
+    contents = [source.get('content') or '' for source in sources]
+    raw_contents = [source.get('raw_content') or '' if include_raw_content else '' for source in sources]
+    scores = [source.get('score') or 0.0 for source in sources]
+
+    content_allocation = allocate_token_budget(counter.count_many(contents), scores, remaining)
+    remaining = max(0, remaining - sum(content_allocation))
+    raw_allocation = allocate_token_budget(counter.count_many(raw_contents), scores, remaining)
+
+    chunks = ["Sources:\n\n"]
+
+    def add_truncated(text, tokens):
+        cut = counter.truncate(text, tokens)
+        chunks.append(cut)
+        if len(cut) < len(text):
+            chunks.append("... [truncated]")
+
+    for i, header in enumerate(headers):
+        chunks.append(header)
+        chunks.append("Most relevant content from source: ")
+        add_truncated(contents[i], content_allocation[i])
+        chunks.append("\n===\n")
         if include_raw_content:
-            # Using rough estimate of 4 characters per token
-            char_limit = max_tokens_per_source * 4
-            # Handle None raw_content
-            raw_content = source.get('raw_content', '')
-            if raw_content is None:
-                raw_content = ''
-                print(f"Warning: No raw_content found for source {source['url']}")
-            if len(raw_content) > char_limit:
-                raw_content = raw_content[:char_limit] + "... [truncated]"
-            formatted_text += f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
-                
-    return formatted_text.strip()
+            chunks.append(f"Full source content limited to {raw_allocation[i]} tokens: ")
+            add_truncated(raw_contents[i], raw_allocation[i])
+        chunks.append("\n\n")
+    allocation = {
+        source['url']: header_tokens[i] + content_allocation[i] + raw_allocation[i]
+        for i, source in enumerate(sources)
+    }
+    return _join_chunks(chunks), allocation
+
+def source_tokens(source, max_tokens_per_source, include_raw_content=True) -> int:
+    """ Estimated tokens a source takes up once formatted, using a rough estimate of 4 characters per token """
+    raw_content = (source.get('raw_content') or '') if include_raw_content else ''
+    return (len(source.get('content') or '') + min(len(raw_content), max_tokens_per_source * 4)) // 4
+
+def collapse_duplicate_sources(search_response, max_tokens_per_source, include_raw_content=True, threshold=0.8):
+    """
+    Removes sources that repeat an earlier source, before they are formatted for the writer.
+
+    A source is a duplicate when its canonical URL was already seen (http/https, www., trailing slashes,
+    utm_* parameters, arXiv abs/pdf links), or when its text is a near-duplicate of an earlier source
+    (e.g. a syndicated copy of the same article) according to MinHash over word n-grams.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        max_tokens_per_source (int): Per-source raw content budget used when formatting
+        include_raw_content (bool): Whether raw content will be formatted, and so counts towards removed tokens
+        threshold (float): Estimated Jaccard similarity at which two texts count as near-duplicates
+
+    Returns:
+        tuple[list, int]: The search responses without duplicate sources, and the estimated tokens removed
+    """
+    # Drop repeated canonical URLs, keeping the first occurrence
+    seen = set()
+    kept = []
+    for response in search_response:
+        for source in response['results']:
+            url = canonicalize_url(source['url'])
+            if url not in seen:
+                seen.add(url)
+                kept.append(source)
+
+    # Then near-duplicate text among the remaining sources
+    texts = [source.get('raw_content') or source.get('content') for source in kept]
+    duplicates = {id(kept[i]) for i, original in enumerate(find_near_duplicates(texts, threshold)) if original is not None}
+    kept_ids = {id(source) for source in kept} - duplicates
+
+    tokens_removed = 0
+    new_responses = []
+    for response in search_response:
+        results = []
+        for source in response['results']:
+            if id(source) in kept_ids:
+                kept_ids.discard(id(source))
+                results.append(source)
+            else:
+                tokens_removed += source_tokens(source, max_tokens_per_source, include_raw_content)
+        new_responses.append(SearchResponse(response['query'], results, response.get('error')))
+
+    return new_responses, tokens_removed
+
+def rerank_sources(search_response, query, max_tokens_per_source, include_raw_content=True, top_k=None):
+    """
+    Orders all sources by BM25 relevance to a query and keeps the top_k most relevant.
+
+    Provider scores are on different scales (and synthesized from rank for arXiv and PubMed), so sources
+    are scored against the query from their own text: title, snippet and the raw content that will be formatted.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        query (str): What the sources should be relevant to, e.g. a section's name and description
+        max_tokens_per_source (int): Per-source raw content budget used when formatting
+        include_raw_content (bool): Whether raw content will be formatted, and so is scored
+        top_k (int, optional): Number of sources to keep. Defaults to all of them.
+
+    Returns:
+        list: A single search response holding the kept sources, most relevant first, each scored by
+            its relevance relative to the best source (0-1)
+    """
+    sources = [source for response in search_response for source in response['results']]
+    char_limit = max_tokens_per_source * 4
+    texts = [
+        f"{source.get('title') or ''}\n{source.get('content') or ''}\n{((source.get('raw_content') or '')[:char_limit]) if include_raw_content else ''}"
+        for source in sources
+    ]
+    scores = bm25_scores(query, texts)
+    # Stable sort, so equally relevant sources keep the search API's order
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    # Results may be shared with other sections, so the relevance scores go on copies
+    best = scores.max() if len(scores) and scores.max() > 0 else 1.0
+    return [SearchResponse(query, [SearchResult.from_dict(sources[i]).with_score(float(scores[i] / best)) for i in order])]
+
+def drop_seen_sources(search_response, source_store):
+    """
+    Removes the sources a section already sent to the writer in earlier iterations.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        source_store (dict): Sources already sent to the writer, keyed by canonical URL
+
+    Returns:
+        list: The search responses with only unseen sources
+    """
+    if not source_store:
+        return search_response
+    return [
+        SearchResponse(response['query'], [source for source in response['results'] if canonicalize_url(source['url']) not in source_store], response.get('error'))
+        for response in search_response
+    ]
+
+def iteration_token_budget(source_store, total_budget, max_iterations, iterations_done) -> int:
+    """
+    Share of a section's source token budget for its next search iteration.
+
+    What earlier iterations left of the budget is split evenly over the iterations still to come, so
+    the first iteration can't use it all up and follow-up searches still reach the writer.
+
+    Args:
+        source_store (dict): Sources already sent to the writer, see select_new_sources
+        total_budget (int): Total tokens of sources for the whole section
+        max_iterations (int): Most search iterations the section can run
+        iterations_done (int): Search iterations already run
+
+    Returns:
+        int: Tokens of sources the next iteration may send
+    """
+    used = sum(entry["tokens"] for entry in (source_store or {}).values())
+    return max(0, total_budget - used) // max(1, max_iterations - iterations_done)
+
+def select_new_sources(search_response, source_store, max_tokens_per_source, include_raw_content=True, token_budget=25_000):
+    """
+    Filters search responses down to the sources a section has not seen yet, within this iteration's token budget.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        source_store (dict): Sources already sent to the writer, keyed by canonical URL, each with 'title', 'url' and 'tokens'
+        max_tokens_per_source (int): Per-source raw content budget used when formatting
+        include_raw_content (bool): Whether raw content will be formatted, and so counts towards the budget
+        token_budget (int): Maximum total tokens of the new sources, see iteration_token_budget
+
+    Returns:
+        tuple[list, dict]: The search responses with only new sources, and the updated source store
+    """
+    store = dict(source_store or {})
+    used_tokens = 0
+    dropped = 0
+
+    new_responses = []
+    for response in search_response:
+        results = []
+        for source in response['results']:
+            url = canonicalize_url(source['url'])
+            if url in store:
+                continue
+            tokens = source_tokens(source, max_tokens_per_source, include_raw_content)
+            if used_tokens + tokens > token_budget:
+                dropped += 1
+                continue
+            store[url] = {"title": source.get('title', ''), "url": source['url'], "tokens": tokens}
+            used_tokens += tokens
+            results.append(source)
+        new_responses.append(SearchResponse(response['query'], results, response.get('error')))
+
+    if dropped:
+        logger.warning("Dropped %d new sources over the iteration's source budget of %d tokens", dropped, token_budget)
+    return new_responses, store
+
+def record_sent_sources(search_response, source_store, sent_tokens):
+    """
+    Adds the sources that were sent to the writer to a section's source store.
+
+    Args:
+        search_response: List of search response dicts, see deduplicate_and_format_sources
+        source_store (dict): Sources already sent to the writer, see select_new_sources
+        sent_tokens (dict): Tokens each sent source took up, keyed by its URL, as returned by format_sources_within_budget
+
+    Returns:
+        dict: The updated source store
+    """
+    store = dict(source_store or {})
+    for response in search_response:
+        for source in response['results']:
+            if source['url'] in sent_tokens:
+                store[canonicalize_url(source['url'])] = {"title": source.get('title', ''), "url": source['url'], "tokens": sent_tokens[source['url']]}
+    return store
+
+def format_cited_sources(source_store) -> str:
+    """
+    Lists the sources a section's writer was given in earlier iterations, so they stay in its ### Sources.
+
+    Args:
+        source_store (dict): Sources already sent to the writer, see select_new_sources
+
+    Returns:
+        str: One "- Title : URL" line per source, or "None" if there are none
+    """
+    if not source_store:
+        return "None"
+    return "\n".join(f"- {entry.get('title', '')} : {entry.get('url', url)}" for url, entry in source_store.items())
 
 def format_sections(sections: list[Section]) -> str:
     """ Format a list of sections into a string """
@@ -120,6 +643,7 @@ Content:
     return formatted_str
 
 @traceable
+@search_backend("tavily", clean_raw_content=True, share_content=True)
 async def tavily_search_async(search_queries):
     """
     Performs concurrent web searches using the Tavily API.
@@ -146,26 +670,42 @@ async def tavily_search_async(search_queries):
                     ]
                 }
     """
-    
-    search_tasks = []
-    for query in search_queries:
-            search_tasks.append(
-                tavily_async_client.search(
-                    query,
-                    max_results=5,
-                    include_raw_content=True,
-                    topic="general"
-                )
+
+    # API keys from TAVILY_API_KEYS or TAVILY_API_KEY, each with its own shared client
+    key_pool = get_key_pool("tavily")
+
+    async def search(query, api_key=None):
+        # Share the Tavily quota with every other section running in this process
+        async with search_scheduler.limit("tavily"):
+            return await get_tavily_async_client(api_key).search(
+                query,
+                max_results=5,
+                include_raw_content=True,
+                topic="general"
             )
 
+    async def process_query(query):
+        try:
+            return await search_resilience.call("tavily", lambda api_key=None: search(query, api_key), key_pool=key_pool)
+        except Exception as e:
+            print(f"Error processing Tavily query '{query}': {str(e)}")
+            # Add a placeholder result for failed queries to maintain index alignment
+            return {"query": query, "follow_up_questions": None, "answer": None, "images": [], "results": [], "error": str(e)}
+
     # Execute all searches concurrently
-    search_docs = await asyncio.gather(*search_tasks)
+    search_docs = await asyncio.gather(*[process_query(query) for query in search_queries])
 
-    return search_docs
+    return list(search_docs)
 
 @traceable
-def perplexity_search(search_queries):
+@search_backend("perplexity")
+async def perplexity_search(search_queries):
     """Search the web using the Perplexity API.
+
+    Queries are sent concurrently over a pooled keep-alive connection, so the event loop
+    is never blocked while waiting on Perplexity. Secondary citations come back without content;
+    their pages are fetched by the shared page fetcher as soon as each query's answer arrives,
+    while the other queries are still in flight.
     
     Args:
         search_queries (List[SearchQuery]): List of search queries to process
@@ -183,22 +723,18 @@ def perplexity_search(search_queries):
                         'url': str,              # URL of the result
                         'content': str,          # Summary/snippet of content
                         'score': float,          # Relevance score
-                        'raw_content': str|None  # Full content or None for secondary citations
+                        'raw_content': str|None  # Full content, or None for secondary citations whose page could not be fetched
                     },
                     ...
                 ]
             }
     """
 
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {os.getenv('PERPLEXITY_API_KEY')}"
-    }
-    
-    search_docs = []
-    for query in search_queries:
+    # API keys from PERPLEXITY_API_KEYS or PERPLEXITY_API_KEY
+    key_pool = get_key_pool("perplexity")
+    client = get_perplexity_client()
 
+    async def process_query(query):
         payload = {
             "model": "sonar-pro",
             "messages": [
@@ -213,52 +749,72 @@ def perplexity_search(search_queries):
             ]
         }
         
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Parse the response
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        citations = data.get("citations", ["https://perplexity.ai"])
-        
-        # Create results list for this query
-        results = []
+        async def post(api_key=None):
+            headers = {
+                "accept": "application/json",
+                "content-type": "application/json",
+                "Authorization": f"Bearer {api_key}"
+            }
+            async with search_scheduler.limit("perplexity"):
+                response = await client.post("/chat/completions", headers=headers, json=payload)
+            response.raise_for_status()  # Raise exception for bad status codes
+            return response
+
+        try:
+            response = await search_resilience.call("perplexity", post, key_pool=key_pool)
+
+            # Parse the response
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            citations = data.get("citations", ["https://perplexity.ai"])
         
-        # First citation gets the full content
-        results.append({
-            "title": f"Perplexity Search, Source 1",
-            "url": citations[0],
-            "content": content,
-            "raw_content": content,
-            "score": 1.0  # Adding score to match Tavily format
-        })
+            # Create results list for this query
+            results = []
         
-        # Add additional citations without duplicating content
-        for i, citation in enumerate(citations[1:], start=2):
+            # First citation gets the full content
             results.append({
-                "title": f"Perplexity Search, Source {i}",
-                "url": citation,
-                "content": "See primary source for full content",
-                "raw_content": None,
-                "score": 0.5  # Lower score for secondary sources
+                "title": f"Perplexity Search, Source 1",
+                "url": citations[0],
+                "content": content,
+                "raw_content": content,
+                "score": 1.0  # Adding score to match Tavily format
             })
         
+            # Add additional citations without duplicating content
+            for i, citation in enumerate(citations[1:], start=2):
+                results.append({
+                    "title": f"Perplexity Search, Source {i}",
+                    "url": citation,
+                    "content": "See primary source for full content",
+                    "raw_content": None,
+                    "score": 0.5  # Lower score for secondary sources
+                })
+
+            # Fill in the secondary citations from their pages
+            fetcher = get_page_fetcher()
+            if fetcher is not None:
+                await fetcher.fill_missing_content(results)
+        except Exception as e:
+            print(f"Error processing Perplexity query '{query}': {str(e)}")
+            # Add a placeholder result for failed queries to maintain index alignment
+            return {"query": query, "follow_up_questions": None, "answer": None, "images": [], "results": [], "error": str(e)}
+
         # Format response to match Tavily structure
-        search_docs.append({
+        return {
             "query": query,
             "follow_up_questions": None,
             "answer": None,
             "images": [],
             "results": results
-        })
-    
-    return search_docs
+        }
+
+    # Execute all searches concurrently
+    search_docs = await asyncio.gather(*[process_query(query) for query in search_queries])
+
+    return list(search_docs)
 
 @traceable
+@search_backend("exa", clean_raw_content=True, share_content=True)
 async def exa_search(search_queries, max_characters: Optional[int] = None, num_results=5, 
                      include_domains: Optional[List[str]] = None, 
                      exclude_domains: Optional[List[str]] = None,
@@ -299,8 +855,8 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
     if include_domains and exclude_domains:
         raise ValueError("Cannot specify both include_domains and exclude_domains")
     
-    # Initialize Exa client (API key should be configured in your .env file)
-    exa = Exa(api_key = f"{os.getenv('EXA_API_KEY')}")
+    # API keys from EXA_API_KEYS or EXA_API_KEY, each with its own shared Exa client
+    key_pool = get_key_pool("exa")
     
     # Define the function to process a single query
     async def process_query(query):
@@ -308,7 +864,7 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
         loop = asyncio.get_event_loop()
         
         # Define the function for the executor with all parameters
-        def exa_search_fn():
+        def exa_search_fn(api_key):
             # Build parameters dictionary
             kwargs = {
                 # Set text to True if max_characters is None, otherwise use an object with max_characters
@@ -326,9 +882,13 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
             elif exclude_domains:
                 kwargs["exclude_domains"] = exclude_domains
                 
-            return exa.search_and_contents(query, **kwargs)
+            return get_exa_client(api_key).search_and_contents(query, **kwargs)
         
-        response = await loop.run_in_executor(None, exa_search_fn)
+        async def search(api_key=None):
+            async with search_scheduler.limit("exa"):
+                return await loop.run_in_executor(None, exa_search_fn, api_key)
+
+        response = await search_resilience.call("exa", search, key_pool=key_pool)
         
         # Format the response to match the expected output structure
         formatted_results = []
@@ -431,46 +991,174 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
             "results": formatted_results
         }
     
-    # Process all queries sequentially with delay to respect rate limit
-    search_docs = []
-    for i, query in enumerate(search_queries):
+    async def process_query_safely(query):
         try:
-            # Add delay between requests (0.25s = 4 requests per second, well within the 5/s limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(0.25)
-            
-            result = await process_query(query)
-            search_docs.append(result)
+            return await process_query(query)
         except Exception as e:
             # Handle exceptions gracefully
             print(f"Error processing query '{query}': {str(e)}")
+            
             # Add a placeholder result for failed queries to maintain index alignment
-            search_docs.append({
+            return {
                 "query": query,
                 "follow_up_questions": None,
                 "answer": None,
                 "images": [],
                 "results": [],
                 "error": str(e)
-            })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e):
-                print("Rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(1.0)  # Add a longer delay if we hit a rate limit
+            }
+    
+    # Process all queries concurrently; the shared scheduler keeps us within Exa's rate limit
+    search_docs = list(await asyncio.gather(*[process_query_safely(query) for query in search_queries]))
     
     return search_docs
 
+# arXiv identifiers, new style (2107.05580, 2107.05580v1) and old style (quant-ph/0201082v1)
+ARXIV_ID_PATTERN = re.compile(r"^(\d{4}\.\d{4,5}|[a-z\-]+(\.[A-Z]{2})?/\d{7})(v\d+)?$")
+ARXIV_VERSION_PATTERN = re.compile(r"v\d+$")
+ARXIV_TERM_PATTERN = re.compile(r"[a-z0-9]{3,}")
+
+# Maximum number of search queries OR-combined into one arXiv API request
+ARXIV_QUERIES_PER_REQUEST = 5
+
+# Share of a query's terms that a paper's title and abstract must contain for the paper to be
+# attributed to that query when it comes back from a combined request
+ARXIV_MIN_TERM_OVERLAP = 0.5
+
+def is_arxiv_identifier(query: str) -> bool:
+    """ Check whether a query is a whitespace-separated list of arXiv identifiers """
+    items = query.split()
+    return bool(items) and all(ARXIV_ID_PATTERN.match(item) for item in items)
+
+def clean_arxiv_query(query: str) -> str:
+    """ Remove characters that break arXiv search queries (":" and "-") and cap the length """
+    return query.replace(":", "").replace("-", "")[:300]
+
+def match_arxiv_ids(query: str, papers: list) -> list:
+    """ The papers requested by an ID query. IDs without a version match any version. """
+    wanted = set(query.split())
+    return [paper for paper in papers if paper.get_short_id() in wanted or ARXIV_VERSION_PATTERN.sub("", paper.get_short_id()) in wanted]
+
+def attribute_arxiv_papers(query: str, papers: list, paper_terms: List[set], max_results: int) -> list:
+    """
+    Picks the papers from a combined search that belong to one of its queries.
+
+    A paper is attributed to the query when its title and abstract contain at least ARXIV_MIN_TERM_OVERLAP
+    of the query's terms. Papers are ranked by that overlap, then by arXiv's relevance order.
+
+    Args:
+        query (str): One of the queries that were OR-combined.
+        papers (list): arxiv.Result objects from the combined search, in relevance order.
+        paper_terms (List[set]): The lowercased terms of each paper's title and abstract.
+        max_results (int): Maximum number of papers to return.
+
+    Returns:
+        list: The attributed papers, best first.
+    """
+    query_terms = set(ARXIV_TERM_PATTERN.findall(query.lower()))
+    if not query_terms:
+        return []
+    scored = []
+    for rank, (paper, terms) in enumerate(zip(papers, paper_terms)):
+        overlap = len(query_terms & terms) / len(query_terms)
+        if overlap >= ARXIV_MIN_TERM_OVERLAP:
+            scored.append((-overlap, rank, paper))
+    scored.sort(key=lambda item: item[:2])
+    return [paper for _, _, paper in scored[:max_results]]
+
+def format_arxiv_paper(paper, score: float, full_text: Optional[str], load_all_available_meta: bool) -> dict:
+    """ Convert an arxiv.Result into a search result with a formatted summary and metadata """
+    # Format content with all useful metadata
+    content_parts = []
+
+    # Primary information
+    content_parts.append(f"Summary: {paper.summary}")
+    content_parts.append(f"Authors: {', '.join(author.name for author in paper.authors)}")
+
+    # Add publication information
+    if paper.updated:
+        content_parts.append(f"Published: {paper.updated.date().isoformat()}")
+
+    # Add additional metadata if requested
+    if load_all_available_meta:
+        if paper.primary_category:
+            content_parts.append(f"Primary Category: {paper.primary_category}")
+
+        if paper.categories:
+            content_parts.append(f"Categories: {', '.join(paper.categories)}")
+
+        if paper.comment:
+            content_parts.append(f"Comment: {paper.comment}")
+
+        if paper.journal_ref:
+            content_parts.append(f"Journal Reference: {paper.journal_ref}")
+
+        if paper.doi:
+            content_parts.append(f"DOI: {paper.doi}")
+
+        if paper.pdf_url:
+            content_parts.append(f"PDF: {paper.pdf_url}")
+
+    return {
+        'title': paper.title,
+        'url': paper.entry_id,  # Using entry_id as the URL
+        'content': "\n".join(content_parts),
+        'score': score,
+        'raw_content': full_text
+    }
+
+async def fetch_arxiv_full_text(arxiv_id: str, pdf_url: str, max_chars: int) -> str:
+    """
+    Returns up to max_chars characters of a paper's full text.
+
+    Text is served from the on-disk cache keyed by arXiv ID and version when possible. Otherwise the PDF
+    is downloaded and parsed in the shared process pool, stopping at the first page that reaches max_chars.
+
+    Args:
+        arxiv_id (str): The versioned arXiv ID, e.g. "2107.05580v1".
+        pdf_url (str): URL of the PDF.
+        max_chars (int): Maximum number of characters needed.
+
+    Returns:
+        str: The extracted text.
+    """
+    loop = asyncio.get_running_loop()
+    text_cache = get_extracted_text_cache()
+    text = await loop.run_in_executor(None, text_cache.get, arxiv_id, max_chars)
+    if text is not None:
+        return text
+
+    async def download():
+        async with search_scheduler.limit("arxiv_pdf"):
+            response = await get_arxiv_http_client().get(pdf_url)
+            response.raise_for_status()
+            return response
+
+    response = await search_resilience.call("arxiv_pdf", download)
+
+    text, complete = await extract_pdf_text_async(response.content, max_chars)
+    await loop.run_in_executor(None, text_cache.set, arxiv_id, text, complete)
+    return text
+
 @traceable
-async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents=True, load_all_available_meta=True):
+@search_backend("arxiv")
+async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents=True, load_all_available_meta=True, full_text_chars_max=4000):
     """
-    Performs concurrent searches on arXiv using the ArxivRetriever.
+    Performs batched searches on arXiv.
+
+    All ID queries are looked up with a single id_list request, and up to ARXIV_QUERIES_PER_REQUEST search
+    queries are OR-combined into one request whose results are attributed back to each query. A query that
+    gets nothing attributed from its combined request is searched again on its own.
+
+    Full texts are extracted from the PDFs in a process pool, only up to full_text_chars_max characters,
+    and cached on disk by arXiv ID and version so repeat papers cost no download or parse time.
 
     Args:
         search_queries (List[str]): List of search queries or article IDs
         load_max_docs (int, optional): Maximum number of documents to return per query. Default is 5.
         get_full_documents (bool, optional): Whether to fetch full text of documents. Default is True.
         load_all_available_meta (bool, optional): Whether to load all available metadata. Default is True.
+        full_text_chars_max (int, optional): Maximum characters of full text to extract per paper. Default is 4000.
 
     Returns:
         List[dict]: List of search responses from arXiv, one per query. Each response has format:
@@ -491,137 +1179,120 @@ async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents
                 ]
             }
     """
-    
-    async def process_single_query(query):
-        try:
-            # Create retriever for each query
-            retriever = ArxivRetriever(
-                load_max_docs=load_max_docs,
-                get_full_documents=get_full_documents,
-                load_all_available_meta=load_all_available_meta
-            )
-            
-            # Run the synchronous retriever in a thread pool
-            loop = asyncio.get_event_loop()
-            docs = await loop.run_in_executor(None, lambda: retriever.invoke(query))
-            
-            results = []
-            # Assign decreasing scores based on the order
-            base_score = 1.0
-            score_decrement = 1.0 / (len(docs) + 1) if docs else 0
-            
-            for i, doc in enumerate(docs):
-                # Extract metadata
-                metadata = doc.metadata
-                
-                # Use entry_id as the URL (this is the actual arxiv link)
-                url = metadata.get('entry_id', '')
-                
-                # Format content with all useful metadata
-                content_parts = []
+    client = get_arxiv_client()
+    loop = asyncio.get_event_loop()
+    papers_by_query: Dict[str, list] = {}
+    errors: Dict[str, Exception] = {}
 
-                # Primary information
-                if 'Summary' in metadata:
-                    content_parts.append(f"Summary: {metadata['Summary']}")
+    async def run_search(search):
+        # Run the synchronous client in a thread pool, within arXiv's shared rate limit
+        async def request():
+            async with search_scheduler.limit("arxiv"):
+                return await loop.run_in_executor(None, lambda: list(client.results(search)))
+        return await search_resilience.call("arxiv", request)
 
-                if 'Authors' in metadata:
-                    content_parts.append(f"Authors: {metadata['Authors']}")
+    def record_error(queries, e):
+        for query in queries:
+            print(f"Error processing arXiv query '{query}': {str(e)}")
+            errors[query] = e
 
-                # Add publication information
-                published = metadata.get('Published')
-                published_str = published.isoformat() if hasattr(published, 'isoformat') else str(published) if published else ''
-                if published_str:
-                    content_parts.append(f"Published: {published_str}")
+    async def search_ids(queries):
+        ids = list(dict.fromkeys(item for query in queries for item in query.split()))
+        try:
+            papers = await run_search(arxiv.Search(id_list=ids, max_results=len(ids)))
+        except Exception as e:
+            record_error(queries, e)
+            return
+        for query in queries:
+            papers_by_query[query] = match_arxiv_ids(query, papers)[:load_max_docs]
 
-                # Add additional metadata if available
-                if 'primary_category' in metadata:
-                    content_parts.append(f"Primary Category: {metadata['primary_category']}")
+    async def search_single(query):
+        try:
+            papers_by_query[query] = await run_search(arxiv.Search(query=clean_arxiv_query(query), max_results=load_max_docs))
+            errors.pop(query, None)
+        except Exception as e:
+            record_error([query], e)
 
-                if 'categories' in metadata and metadata['categories']:
-                    content_parts.append(f"Categories: {', '.join(metadata['categories'])}")
+    async def search_combined(queries):
+        combined = " OR ".join(f"({clean_arxiv_query(query)})" for query in queries)
+        try:
+            papers = await run_search(arxiv.Search(query=combined, max_results=load_max_docs * len(queries) * 2))
+        except Exception as e:
+            # Leave the queries unattributed so they are retried one by one
+            logger.warning("Error processing combined arXiv query for %d queries: %s", len(queries), e)
+            return
+        paper_terms = [set(ARXIV_TERM_PATTERN.findall(f"{paper.title} {paper.summary}".lower())) for paper in papers]
+        for query in queries:
+            papers_by_query[query] = attribute_arxiv_papers(query, papers, paper_terms, load_max_docs)
 
-                if 'comment' in metadata and metadata['comment']:
-                    content_parts.append(f"Comment: {metadata['comment']}")
+    id_queries = [query for query in search_queries if is_arxiv_identifier(query)]
+    text_queries = [query for query in dict.fromkeys(search_queries) if query not in id_queries]
+    batches = [text_queries[i:i + ARXIV_QUERIES_PER_REQUEST] for i in range(0, len(text_queries), ARXIV_QUERIES_PER_REQUEST)]
 
-                if 'journal_ref' in metadata and metadata['journal_ref']:
-                    content_parts.append(f"Journal Reference: {metadata['journal_ref']}")
+    tasks = [search_ids(id_queries)] if id_queries else []
+    for batch in batches:
+        tasks.append(search_single(batch[0]) if len(batch) == 1 else search_combined(batch))
+    await asyncio.gather(*tasks)
 
-                if 'doi' in metadata and metadata['doi']:
-                    content_parts.append(f"DOI: {metadata['doi']}")
+    # Fall back to a request of its own for each query the combined requests didn't cover
+    retry = [query for batch in batches if len(batch) > 1 for query in batch if not papers_by_query.get(query)]
+    if retry:
+        await asyncio.gather(*[search_single(query) for query in retry])
 
-                # Get PDF link if available in the links
-                pdf_link = ""
-                if 'links' in metadata and metadata['links']:
-                    for link in metadata['links']:
-                        if 'pdf' in link:
-                            pdf_link = link
-                            content_parts.append(f"PDF: {pdf_link}")
-                            break
+    # Extract full text once per paper, even when several queries returned it
+    full_texts = {}
+    if get_full_documents:
+        unique_papers = {paper.get_short_id(): paper for papers in papers_by_query.values() for paper in papers}
+
+        async def get_full_text(paper):
+            try:
+                return await fetch_arxiv_full_text(paper.get_short_id(), paper.pdf_url, full_text_chars_max)
+            except Exception as e:
+                logger.warning("Error extracting full text for arXiv paper '%s': %s", paper.entry_id, e)
+                return None
+
+        texts = await asyncio.gather(*[get_full_text(paper) for paper in unique_papers.values()])
+        full_texts = dict(zip(unique_papers, texts))
 
-                # Join all content parts with newlines 
-                content = "\n".join(content_parts)
-                
-                result = {
-                    'title': metadata.get('Title', ''),
-                    'url': url,  # Using entry_id as the URL
-                    'content': content,
-                    'score': base_score - (i * score_decrement),
-                    'raw_content': doc.page_content if get_full_documents else None
-                }
-                results.append(result)
-                
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': results
-            }
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing arXiv query '{query}': {str(e)}")
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            }
-    
-    # Process queries sequentially with delay to respect arXiv rate limit (1 request per 3 seconds)
     search_docs = []
-    for i, query in enumerate(search_queries):
-        try:
-            # Add delay between requests (3 seconds per ArXiv's rate limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(3.0)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing arXiv query '{query}': {str(e)}")
+    for query in search_queries:
+        if query in errors:
             search_docs.append({
                 'query': query,
                 'follow_up_questions': None,
                 'answer': None,
                 'images': [],
                 'results': [],
-                'error': str(e)
+                'error': str(errors[query])
             })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                print("ArXiv rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(5.0)  # Add a longer delay if we hit a rate limit
+            continue
+
+        papers = papers_by_query.get(query, [])
+        # Assign decreasing scores based on the order
+        base_score = 1.0
+        score_decrement = 1.0 / (len(papers) + 1) if papers else 0
+        results = [
+            format_arxiv_paper(paper, base_score - (i * score_decrement), full_texts.get(paper.get_short_id()), load_all_available_meta)
+            for i, paper in enumerate(papers)
+        ]
+        search_docs.append({
+            'query': query,
+            'follow_up_questions': None,
+            'answer': None,
+            'images': [],
+            'results': results
+        })
     
     return search_docs
 
 @traceable
+@search_backend("pubmed")
 async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_key=None, doc_content_chars_max=4000):
     """
-    Performs concurrent searches on PubMed using the PubMedAPIWrapper.
+    Performs batched searches on PubMed through the NCBI E-utilities.
+
+    Each query gets one esearch request, then the articles for every query in the batch are retrieved
+    with a single efetch request and parsed article by article.
 
     Args:
         search_queries (List[str]): List of search queries
@@ -650,118 +1321,328 @@ async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_k
             }
     """
     
-    async def process_single_query(query):
+    # NCBI allows 10 requests per second with an API key and 3 without
+    rate_limit_key = "pubmed_keyed" if api_key else "pubmed"
+    client = get_pubmed_client()
+
+    def error_response(query, e):
+        return {
+            'query': query,
+            'follow_up_questions': None,
+            'answer': None,
+            'images': [],
+            'results': [],
+            'error': str(e)
+        }
+
+    async def search_ids(query):
+        async def request():
+            async with search_scheduler.limit(rate_limit_key):
+                return await esearch(client, query, top_k_results, email=email, api_key=api_key)
         try:
-            # print(f"Processing PubMed query: '{query}'")
-            
-            # Create PubMed wrapper for the query
-            wrapper = PubMedAPIWrapper(
-                top_k_results=top_k_results,
-                doc_content_chars_max=doc_content_chars_max,
-                email=email if email else "your_email@example.com",
-                api_key=api_key if api_key else ""
-            )
+            return await search_resilience.call(rate_limit_key, request)
+        except Exception as e:
+            print(f"Error processing PubMed query '{query}': {str(e)}")
+            return e
+
+    # One esearch per query, sent concurrently; the shared scheduler keeps us within NCBI's rate limit
+    id_lists = await asyncio.gather(*[search_ids(query) for query in search_queries])
+
+    # Fetch every article found by any query in one request
+    all_ids = list(dict.fromkeys(uid for ids in id_lists if not isinstance(ids, Exception) for uid in ids))
+    async def fetch_articles():
+        async with search_scheduler.limit(rate_limit_key):
+            return await efetch(client, all_ids, email=email, api_key=api_key)
+    try:
+        articles = await search_resilience.call(rate_limit_key, fetch_articles)
+    except Exception as e:
+        logger.warning("Error fetching %d PubMed articles: %s", len(all_ids), e)
+        return [error_response(query, e) for query in search_queries]
+
+    search_docs = []
+    for query, ids in zip(search_queries, id_lists):
+        if isinstance(ids, Exception):
+            search_docs.append(error_response(query, ids))
+            continue
+
+        docs = [articles[uid] for uid in ids if uid in articles]
+        print(f"Query '{query}' returned {len(docs)} results")
+        
+        results = []
+        # Assign decreasing scores based on the order
+        base_score = 1.0
+        score_decrement = 1.0 / (len(docs) + 1) if docs else 0
+        
+        for i, doc in enumerate(docs):
+            summary = doc['Summary'][:doc_content_chars_max]
+
+            # Format content with metadata
+            content_parts = []
             
-            # Run the synchronous wrapper in a thread pool
-            loop = asyncio.get_event_loop()
+            if doc.get('Published'):
+                content_parts.append(f"Published: {doc['Published']}")
             
-            # Use wrapper.lazy_load instead of load to get better visibility
-            docs = await loop.run_in_executor(None, lambda: list(wrapper.lazy_load(query)))
+            if doc.get('Copyright Information'):
+                content_parts.append(f"Copyright Information: {doc['Copyright Information']}")
             
-            print(f"Query '{query}' returned {len(docs)} results")
+            if summary:
+                content_parts.append(f"Summary: {summary}")
             
-            results = []
-            # Assign decreasing scores based on the order
-            base_score = 1.0
-            score_decrement = 1.0 / (len(docs) + 1) if docs else 0
+            # Join all content parts with newlines
+            content = "\n".join(content_parts)
             
-            for i, doc in enumerate(docs):
-                # Format content with metadata
-                content_parts = []
-                
-                if doc.get('Published'):
-                    content_parts.append(f"Published: {doc['Published']}")
-                
-                if doc.get('Copyright Information'):
-                    content_parts.append(f"Copyright Information: {doc['Copyright Information']}")
-                
-                if doc.get('Summary'):
-                    content_parts.append(f"Summary: {doc['Summary']}")
-                
-                # Generate PubMed URL from the article UID
-                uid = doc.get('uid', '')
-                url = f"https://pubmed.ncbi.nlm.nih.gov/{uid}/" if uid else ""
-                
-                # Join all content parts with newlines
-                content = "\n".join(content_parts)
-                
-                result = {
-                    'title': doc.get('Title', ''),
-                    'url': url,
-                    'content': content,
-                    'score': base_score - (i * score_decrement),
-                    'raw_content': doc.get('Summary', '')
-                }
-                results.append(result)
-            
-            return {
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': results
+            result = {
+                'title': doc['Title'],
+                'url': f"https://pubmed.ncbi.nlm.nih.gov/{doc['uid']}/",
+                'content': content,
+                'score': base_score - (i * score_decrement),
+                'raw_content': summary
             }
-        except Exception as e:
-            # Handle exceptions with more detailed information
-            error_msg = f"Error processing PubMed query '{query}': {str(e)}"
-            print(error_msg)
-            import traceback
-            print(traceback.format_exc())  # Print full traceback for debugging
-            
-            return {
-                'query': query,
-                'follow_up_questions': None,
+            results.append(result)
+        
+        search_docs.append({
+            'query': query,
+            'follow_up_questions': None,
+            'answer': None,
+            'images': [],
+            'results': results
+        })
+    
+    return search_docs
+
+@traceable
+async def local_search_async(search_queries, corpus_dir: Optional[str] = None, index_path: Optional[str] = None, max_results: int = 5):
+    """
+    Searches a local directory of text, markdown and PDF documents with a persistent BM25 index.
+
+    The index is brought up to date with the directory (only changed files are re-read) before searching,
+    and all work runs in a thread pool so the event loop is never blocked. No network I/O is involved.
+
+    Args:
+        search_queries (List[str]): List of search queries
+        corpus_dir (str, optional): Directory of documents to search. Defaults to the LOCAL_CORPUS_DIR
+            environment variable, or "source_docs".
+        index_path (str, optional): Location of the index file. Defaults to a file in the cache dir.
+        max_results (int, optional): Maximum number of documents to return per query. Default is 5.
+
+    Returns:
+        List[SearchResponse]: List of search responses, one per query. Each response reads as:
+            {
+                'query': str,                    # The original search query
+                'follow_up_questions': None,      
                 'answer': None,
                 'images': [],
-                'results': [],
-                'error': str(e)
+                'results': [                     # List of search results
+                    {
+                        'title': str,            # Title of the document
+                        'url': str,              # file:// URL of the document
+                        'content': str,          # Best matching passage
+                        'score': float,          # BM25 score relative to the best match for the query
+                        'raw_content': str       # Matching passages of the document, in document order
+                    },
+                    ...
+                ]
             }
-    
-    # Process all queries with a reasonable delay between them
-    search_docs = []
-    
-    # Start with a small delay that increases if we encounter rate limiting
-    delay = 1.0  # Start with a more conservative delay
-    
-    for i, query in enumerate(search_queries):
+    """
+    corpus_dir = corpus_dir or os.getenv("LOCAL_CORPUS_DIR", "source_docs")
+    loop = asyncio.get_running_loop()
+    index = await loop.run_in_executor(None, get_local_index, corpus_dir, index_path)
+    await loop.run_in_executor(None, index.refresh)
+
+    async def process_query(query):
+        documents = await loop.run_in_executor(None, index.search, query, max_results)
+        best_score = documents[0]["score"] if documents else 0
+        results = [
+            SearchResult(
+                title=document["title"],
+                url=f"file://{document['path']}",
+                content=document["best_chunk"],
+                score=document["score"] / best_score if best_score > 0 else 0.0,
+                raw_content="\n\n...\n\n".join(document["chunks"])
+            )
+            for document in documents
+        ]
+        return SearchResponse(query, results)
+
+    return list(await asyncio.gather(*[process_query(query) for query in search_queries]))
+
+SEARCH_BACKENDS = {
+    "tavily": tavily_search_async,
+    "perplexity": perplexity_search,
+    "exa": exa_search,
+    "arxiv": arxiv_search_async,
+    "pubmed": pubmed_search_async,
+    "local": local_search_async,
+}
+
+async def select_and_execute_search(search_api: str, query_list: List[str], params_to_pass: Dict[str, Any]) -> List[dict]:
+    """
+    Runs a list of queries against one search API.
+
+    Args:
+        search_api (str): The search API identifier (e.g., "exa", "tavily").
+        query_list (List[str]): The search queries.
+        params_to_pass (Dict[str, Any]): Parameters from get_search_params for this search API.
+
+    Returns:
+        List[dict]: One Tavily-shaped search response per query.
+    """
+    search_fn = SEARCH_BACKENDS.get(search_api)
+    if search_fn is None:
+        raise ValueError(f"Unsupported search API: {search_api}")
+    return await search_fn(query_list, **params_to_pass)
+
+# Hedge delay used until a provider has enough latency samples for a percentile
+DEFAULT_HEDGE_DELAY = 5.0
+
+async def hedged_search(search_apis: List[str], query_list: List[str], search_api_config: Optional[Dict[str, Any]], percentile: float = 0.95) -> List[dict]:
+    """
+    Runs each query against the first search API and hedges slow queries against the next ones.
+
+    If a provider has not answered a query within its observed latency at the given percentile,
+    the same query is sent to the next provider in the list. The first successful response wins
+    and the outstanding requests are cancelled. A failed response triggers the next provider
+    immediately. Responses are interchangeable because every backend returns the Tavily shape.
+
+    Args:
+        search_apis (List[str]): Search API identifiers in order of preference.
+        query_list (List[str]): The search queries.
+        search_api_config (Dict[str, Any], optional): The search API config, filtered per provider with get_search_params.
+        percentile (float): Latency percentile (0-1) of a provider to wait before hedging.
+
+    Returns:
+        List[dict]: One Tavily-shaped search response per query.
+    """
+    # Nothing to hedge against
+    if len(search_apis) == 1:
+        return await select_and_execute_search(search_apis[0], query_list, get_search_params(search_apis[0], search_api_config))
+
+    loop = asyncio.get_running_loop()
+
+    def task_response(task, api, query):
+        # A raised exception is turned into the same error placeholder the backends return
+        if task.exception() is not None:
+            logger.warning("Hedged search on %s failed for query '%s': %s", api, query, task.exception())
+            return SearchResponse(query, error=str(task.exception()))
+        return task.result()[0]
+
+    async def hedge_query(query):
+        pending = {}
+        last_response = None
         try:
-            # Add delay between requests
-            if i > 0:  # Don't delay the first request
-                # print(f"Waiting {delay} seconds before next query...")
-                await asyncio.sleep(delay)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-            
-            # If query was successful with results, we can slightly reduce delay (but not below minimum)
-            if result.get('results') and len(result['results']) > 0:
-                delay = max(0.5, delay * 0.9)  # Don't go below 0.5 seconds
-            
+            for index, api in enumerate(search_apis):
+                task = asyncio.ensure_future(select_and_execute_search(api, [query], get_search_params(api, search_api_config)))
+                pending[task] = api
+                is_last = index == len(search_apis) - 1
+                deadline = None if is_last else loop.time() + search_latency.percentile(api, percentile, default=DEFAULT_HEDGE_DELAY)
+
+                # Wait for a winner until the hedge deadline. The last provider waits for everything outstanding.
+                while pending:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        break  # Deadline passed, hedge on the next provider
+                    for task in done:
+                        response = task_response(task, pending.pop(task), query)
+                        if not response.get("error"):
+                            return response
+                        last_response = response
+                    if not is_last:
+                        break  # A provider failed, hedge on the next one right away
+            return last_response
+        finally:
+            # Cancel the losers
+            for task in pending:
+                task.cancel()
+
+    return list(await asyncio.gather(*[hedge_query(query) for query in query_list]))
+
+# Search APIs whose backends combine a list of queries into fewer requests (or one index refresh),
+# so their queries are still sent as one batch when streaming
+BATCHED_SEARCH_APIS = ("arxiv", "pubmed", "local")
+# Completed responses that may wait for the consumer before further searches block on handing theirs over
+DEFAULT_STREAM_BUFFER = 4
+
+async def stream_search(search_apis: List[str], query_list: List[str], search_api_config: Optional[Dict[str, Any]],
+                        percentile: float = 0.95, buffer_size: int = DEFAULT_STREAM_BUFFER):
+    """
+    Runs the queries like hedged_search, but yields each query's response as soon as it completes.
+
+    Every query is searched (and hedged) on its own, except for batched search APIs, whose queries are
+    sent together and yielded when the batch completes. Completed responses wait in a bounded buffer,
+    so searches that finish faster than the consumer processes them wait instead of piling up. Closing
+    the generator early (e.g. once enough sources have arrived) cancels the searches still running.
+
+    Args:
+        search_apis (List[str]): Search API identifiers in order of preference.
+        query_list (List[str]): The search queries.
+        search_api_config (Dict[str, Any], optional): The search API config, filtered per provider with get_search_params.
+        percentile (float): Latency percentile (0-1) of a provider to wait before hedging.
+        buffer_size (int): Number of completed responses buffered for the consumer.
+
+    Yields:
+        SearchResponse: One Tavily-shaped search response per query, in order of completion.
+    """
+    buffer = asyncio.Queue(maxsize=max(1, buffer_size))
+    batches = [query_list] if search_apis[0] in BATCHED_SEARCH_APIS else [[query] for query in query_list]
+
+    async def produce(batch):
+        try:
+            responses = await hedged_search(search_apis, batch, search_api_config, percentile)
         except Exception as e:
-            # Handle exceptions gracefully
-            error_msg = f"Error in main loop processing PubMed query '{query}': {str(e)}"
-            print(error_msg)
-            
-            search_docs.append({
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            })
-            
-            # If we hit an exception, increase delay for next query
-            delay = min(5.0, delay * 1.5)  # Don't exceed 5 seconds
-    
-    return search_docs
\ No newline at end of file
+            # A raised exception is turned into the same error placeholder the backends return
+            logger.warning("Search on %s failed for queries %s: %s", search_apis[0], batch, e)
+            responses = [SearchResponse(query, error=str(e)) for query in batch]
+        for response in responses:
+            await buffer.put(response)
+
+    producers = [asyncio.ensure_future(produce(batch)) for batch in batches]
+    try:
+        for _ in range(len(query_list)):
+            yield await buffer.get()
+    finally:
+        for producer in producers:
+            producer.cancel()
+
+async def collect_search_results(search_apis: List[str], query_list: List[str], search_api_config: Optional[Dict[str, Any]],
+                                 max_tokens_per_source: int, include_raw_content: bool = True, percentile: float = 0.95,
+                                 enough_sources: Optional[int] = None, enough_tokens: Optional[int] = None) -> List[SearchResponse]:
+    """
+    Collects search responses as they complete, optionally moving on before the slowest queries finish.
+
+    Sources are counted once per canonical URL as responses arrive. As soon as enough_sources distinct
+    sources or enough_tokens tokens of them have arrived, the remaining searches are cancelled.
+
+    Args:
+        search_apis (List[str]): Search API identifiers in order of preference.
+        query_list (List[str]): The search queries.
+        search_api_config (Dict[str, Any], optional): The search API config.
+        max_tokens_per_source (int): Per-source token limit used to count the tokens of a source.
+        include_raw_content (bool): Whether the raw content counts towards a source's tokens.
+        percentile (float): Latency percentile (0-1) of a provider to wait before hedging.
+        enough_sources (int, optional): Number of distinct sources after which to stop waiting. None waits for all queries.
+        enough_tokens (int, optional): Source tokens after which to stop waiting. None waits for all queries.
+
+    Returns:
+        List[SearchResponse]: The responses that arrived, in order of completion.
+    """
+    responses = []
+    seen_urls = set()
+    tokens = 0
+    stream = stream_search(search_apis, query_list, search_api_config, percentile)
+    try:
+        async for response in stream:
+            responses.append(response)
+            for source in response.results:
+                url = canonicalize_url(source['url'])
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    tokens += source_tokens(source, max_tokens_per_source, include_raw_content)
+            if len(responses) < len(query_list) and (
+                (enough_sources and len(seen_urls) >= enough_sources) or (enough_tokens and tokens >= enough_tokens)
+            ):
+                logger.info("Got %d sources (%d tokens) from %d of %d queries, not waiting for the rest", len(seen_urls), tokens, len(responses), len(query_list))
+                break
+    finally:
+        await stream.aclose()
+    return responses
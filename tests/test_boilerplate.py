@@ -0,0 +1,28 @@
+import pytest
+
+from open_deep_research.boilerplate import clean_page_text
+
+
+@pytest.mark.parametrize("line", [
+    "Informed consent was obtained from all participants.",
+    "Cookies are small text files that a website stores on your device.",
+    "The society's newsletter is published quarterly.",
+    "Copyright law was reformed in 1976.",
+    "Share prices fell sharply after the announcement.",
+])
+def test_prose_mentioning_chrome_words_is_kept(line):
+    assert clean_page_text(f"Intro paragraph of the article.\n\n{line}") == f"Intro paragraph of the article.\n\n{line}"
+
+
+@pytest.mark.parametrize("line", [
+    "We use cookies to improve your experience.",
+    "Accept all cookies",
+    "Privacy Policy",
+    "© 2024 Example Inc. All rights reserved.",
+    "Skip to main content",
+    "Share this article",
+    "Sign up for our newsletter",
+    "Please enable JavaScript to view the comments.",
+])
+def test_chrome_lines_are_dropped(line):
+    assert clean_page_text(f"Intro paragraph of the article.\n\n{line}") == "Intro paragraph of the article."
@@ -0,0 +1,23 @@
+import asyncio
+
+from open_deep_research.cache import SingleFlight
+
+
+def test_stats_clear_forgets_only_that_run(monkeypatch):
+    flight = SingleFlight()
+
+    async def fetch(owned):
+        await asyncio.sleep(0)
+        return {key: {"query": query} for key, query in owned.items()}
+
+    async def search(run_id):
+        monkeypatch.setattr("open_deep_research.cache.get_run_id", lambda: run_id)
+        await flight.run("tavily", {f"{run_id}-key": "query"}, fetch)
+
+    asyncio.run(search("run-a"))
+    asyncio.run(search("run-b"))
+    assert flight.stats("run-a", clear=True) == {"tavily": {"requested": 1, "saved": 0}}
+    assert flight.stats("run-a") == {}
+    assert flight.stats() == {"tavily": {"requested": 1, "saved": 0}}
+    flight.stats(clear=True)
+    assert flight.stats() == {}
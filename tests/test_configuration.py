@@ -0,0 +1,34 @@
+from open_deep_research.configuration import Configuration, SearchAPI
+
+
+def test_defaults_without_config():
+    configurable = Configuration.from_runnable_config()
+    assert configurable.source_token_budget == 20_000
+    assert configurable.number_of_queries == 2
+
+
+def test_explicit_none_disables_source_token_budget():
+    configurable = Configuration.from_runnable_config({"configurable": {"source_token_budget": None}})
+    assert configurable.source_token_budget is None
+
+
+def test_zero_is_kept():
+    configurable = Configuration.from_runnable_config({"configurable": {"source_token_budget": 0}})
+    assert configurable.source_token_budget == 0
+
+
+def test_none_for_required_field_keeps_default():
+    configurable = Configuration.from_runnable_config({"configurable": {"number_of_queries": None}})
+    assert configurable.number_of_queries == 2
+
+
+def test_environment_overrides_config(monkeypatch):
+    monkeypatch.setenv("NUMBER_OF_QUERIES", "5")
+    configurable = Configuration.from_runnable_config({"configurable": {"number_of_queries": 3, "search_api": SearchAPI.EXA}})
+    assert configurable.number_of_queries == "5"
+    assert configurable.search_api == SearchAPI.EXA
+
+
+def test_explicit_none_keeps_all_reranked_sources():
+    configurable = Configuration.from_runnable_config({"configurable": {"rerank_top_k": None}})
+    assert configurable.rerank_top_k is None
@@ -0,0 +1,34 @@
+import random
+
+from open_deep_research.dedup import find_near_duplicates
+
+
+def words(count, seed):
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(100_000)}" for _ in range(count)]
+
+
+def test_identical_and_lightly_edited_copies_are_duplicates():
+    article = words(400, seed=1)
+    edited = list(article)
+    edited[200] = "changed"
+    texts = [" ".join(article), " ".join(words(400, seed=2)), " ".join(edited)]
+    assert find_near_duplicates(texts) == [None, None, 0]
+
+
+def test_threshold_decides_partial_overlap():
+    article = words(400, seed=1)
+    # Shares half of its text with the article, a Jaccard similarity of about 1/3
+    partial = article[:200] + words(200, seed=3)
+    texts = [" ".join(article), " ".join(partial)]
+    assert find_near_duplicates(texts, threshold=0.8) == [None, None]
+    assert find_near_duplicates(texts, threshold=0.2) == [None, 0]
+
+
+def test_chains_point_at_the_first_kept_text():
+    article = " ".join(words(400, seed=1))
+    assert find_near_duplicates([article, article, article]) == [None, 0, 0]
+
+
+def test_missing_and_short_texts_are_never_matched():
+    assert find_near_duplicates([None, "too short", None, "too short"]) == [None, None, None, None]
@@ -0,0 +1,49 @@
+from open_deep_research.utils import format_sources_within_budget
+
+# Unknown to tiktoken, so tokens are estimated from characters without downloading an encoding
+MODEL = "not-a-tiktoken-model"
+
+
+def make_response(*sources):
+    return [{"query": "q", "results": list(sources)}]
+
+
+def make_source(url, content, raw_content=None, score=1.0):
+    return {"title": url, "url": url, "content": content, "raw_content": raw_content, "score": score}
+
+
+def test_budget_applies_to_content_without_raw_content():
+    response = make_response(make_source("a", "word " * 5_000), make_source("b", "short"))
+    formatted, _ = format_sources_within_budget(response, 500, MODEL, include_raw_content=False)
+    assert len(formatted) < 4_000
+    assert "... [truncated]" in formatted
+    assert "short" in formatted
+    assert "Full source content" not in formatted
+
+
+def test_budget_applies_to_content_and_raw_content():
+    response = make_response(make_source("a", "word " * 5_000, "raw " * 5_000))
+    formatted, _ = format_sources_within_budget(response, 500, MODEL)
+    assert len(formatted) < 4_000
+
+
+def test_small_sources_are_kept_whole():
+    response = make_response(make_source("a", "snippet", "full text"))
+    formatted, _ = format_sources_within_budget(response, 500, MODEL)
+    assert "snippet" in formatted
+    assert "full text" in formatted
+    assert "[truncated]" not in formatted
+
+
+def test_allocation_is_returned_per_source():
+    response = make_response(make_source("a", "word " * 5_000, "raw " * 5_000), make_source("b", "short", "full text"))
+    formatted, allocation = format_sources_within_budget(response, 1_000, MODEL)
+    assert set(allocation) == {"a", "b"}
+    assert sum(allocation.values()) <= 1_000
+
+
+def test_sources_whose_header_does_not_fit_are_left_out():
+    response = make_response(*[make_source(f"https://example.com/{i}", "snippet") for i in range(20)])
+    formatted, allocation = format_sources_within_budget(response, 50, MODEL)
+    assert 0 < len(allocation) < 20
+    assert "https://example.com/19" not in formatted
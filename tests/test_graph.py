@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from open_deep_research import graph as report_graph
+from open_deep_research import utils
+from open_deep_research.state import Feedback, Queries, SearchQuery, SearchResponse, SearchResult, Section, Sections
+
+CONFIG = {"configurable": {"planner_model": "fake-planner", "writer_model": "fake-writer", "search_api": "tavily", "thread_id": "test"}}
+
+
+class FakeModel:
+    """ Canned responses for every structured output the graph asks for """
+
+    def __init__(self, structured_output):
+        self.structured_output = structured_output
+
+    async def ainvoke(self, messages):
+        if self.structured_output is Queries:
+            return Queries(queries=[SearchQuery(search_query="cats"), SearchQuery(search_query="dogs")])
+        if self.structured_output is Sections:
+            return Sections(sections=[
+                Section(name="Cats", description="Cats as pets", research=True, content=""),
+                Section(name="Dogs", description="Dogs as pets", research=True, content=""),
+                Section(name="Conclusion", description="Summary", research=False, content=""),
+            ])
+        if self.structured_output is Feedback:
+            return Feedback(grade="pass", follow_up_queries=[])
+        return AIMessage(content="Section text.")
+
+
+def page(url, text):
+    return SearchResult(url, url, text[:100], 1.0, text)
+
+
+async def fake_search(search_queries, **kwargs):
+    # Every query finds a syndicated copy of the same article under a second URL
+    article = " ".join(f"word{i}" for i in range(300))
+    return [
+        SearchResponse(query, [
+            page(f"https://example.com/{query}", f"{query} {article}"),
+            page(f"https://mirror.example.org/{query}", f"{query} {article}"),
+        ])
+        for query in search_queries
+    ]
+
+
+@pytest.fixture
+def fake_apis(monkeypatch):
+    for name in ("SEARCH_CACHE_DISABLED", "CONTENT_STORE_DISABLED", "PAGE_FETCH_DISABLED"):
+        monkeypatch.setenv(name, "true")
+    monkeypatch.setitem(utils.SEARCH_BACKENDS, "tavily", fake_search)
+    monkeypatch.setattr(report_graph, "get_chat_model", lambda model, provider, structured_output=None, tools=None, **kwargs: FakeModel(structured_output))
+
+
+def test_duplicate_tokens_removed_is_reported_for_the_run(fake_apis):
+    graph = report_graph.builder.compile(checkpointer=MemorySaver())
+
+    async def run():
+        await graph.ainvoke({"topic": "pets"}, CONFIG)
+        return await graph.ainvoke(Command(resume=True), CONFIG)
+
+    result = asyncio.run(run())
+    assert result["final_report"]
+    # Two research sections, each dropping the mirrored copy of both of its query results
+    assert result["duplicate_tokens_removed"] > 0
+    per_section = utils.collapse_duplicate_sources(asyncio.run(fake_search(["cats", "dogs"])), 5000)[1]
+    assert result["duplicate_tokens_removed"] == 2 * per_section
+
+
+async def topical_search(search_queries, **kwargs):
+    # Five distinct pages per query, each mostly about the query's own words
+    return [
+        SearchResponse(query, [
+            page(f"https://example.com/{query.replace(' ', '-')}/{i}", f"{query} " * 40 + " ".join(f"{query}{i}x{n}" for n in range(200)))
+            for i in range(5)
+        ])
+        for query in search_queries
+    ]
+
+
+def test_follow_up_iteration_gets_new_sources_past_top_k(fake_apis, monkeypatch):
+    monkeypatch.setitem(utils.SEARCH_BACKENDS, "tavily", topical_search)
+    config = {"configurable": {**CONFIG["configurable"], "source_token_budget": None}}
+    section = Section(name="Cats and dogs", description="Cats and dogs as pets", research=True, content="")
+
+    state = {"topic": "pets", "section": section, "search_iterations": 0,
+             "search_queries": [SearchQuery(search_query="cats"), SearchQuery(search_query="dogs")]}
+    first = asyncio.run(report_graph.search_web(state, config))
+    assert len(first["source_store"]) == 10
+
+    # The grader's follow-up repeats the on-topic queries and adds a new one
+    state.update(first, search_queries=[SearchQuery(search_query=query) for query in ("cats", "dogs", "pet food")])
+    second = asyncio.run(report_graph.search_web(state, config))
+    new_urls = set(second["source_store"]) - set(first["source_store"])
+    assert len(new_urls) == 5
+    assert all("pet-food" in url for url in new_urls)
+    assert second["source_str"].count("URL: https://example.com/pet-food/") == 5
+
+
+async def long_page_search(search_queries, **kwargs):
+    # Realistic full pages of about 20k characters, so each source is charged the full per-source cap
+    return [
+        SearchResponse(query, [
+            page(f"https://example.com/{query.replace(' ', '-')}/{i}", " ".join(f"{query}{i}x{n}" for n in range(2_500)))
+            for i in range(5)
+        ])
+        for query in search_queries
+    ]
+
+
+def test_every_iteration_gets_a_share_of_the_section_budget(fake_apis, monkeypatch):
+    monkeypatch.setitem(utils.SEARCH_BACKENDS, "tavily", long_page_search)
+    config = {"configurable": {**CONFIG["configurable"], "source_token_budget": None, "rerank_top_k": None}}
+    section = Section(name="Pets", description="Pets", research=True, content="")
+
+    state = {"topic": "pets", "section": section, "search_iterations": 0,
+             "search_queries": [SearchQuery(search_query="cats"), SearchQuery(search_query="dogs")]}
+    first = asyncio.run(report_graph.search_web(state, config))
+    first_tokens = sum(entry["tokens"] for entry in first["source_store"].values())
+    assert 0 < first_tokens <= 25_000
+
+    state.update(first, search_queries=[SearchQuery(search_query="pet food")])
+    second = asyncio.run(report_graph.search_web(state, config))
+    assert len(second["source_store"]) > len(first["source_store"])
+    assert sum(entry["tokens"] for entry in second["source_store"].values()) <= 50_000
+
+
+def test_budgeted_sources_are_charged_what_they_were_given(fake_apis, monkeypatch):
+    monkeypatch.setitem(utils.SEARCH_BACKENDS, "tavily", long_page_search)
+    config = {"configurable": {**CONFIG["configurable"], "source_token_budget": 20_000, "rerank_top_k": None}}
+    section = Section(name="Pets", description="Pets", research=True, content="")
+
+    state = {"topic": "pets", "section": section, "search_iterations": 0,
+             "search_queries": [SearchQuery(search_query="cats"), SearchQuery(search_query="dogs")]}
+    first = asyncio.run(report_graph.search_web(state, config))
+    assert len(first["source_store"]) == 10
+    charged = sum(entry["tokens"] for entry in first["source_store"].values())
+    assert 15_000 < charged <= 20_000
+
+    state.update(first, search_queries=[SearchQuery(search_query="pet food")])
+    second = asyncio.run(report_graph.search_web(state, config))
+    assert len(second["source_store"]) == 15
@@ -0,0 +1,82 @@
+import pytest
+
+from open_deep_research import key_pool
+from open_deep_research.key_pool import DEFAULT_RATE_LIMIT_COOLDOWN, REJECTED_KEY_COOLDOWN, KeyPool, api_keys, get_key_pool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(key_pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_keys_rotate_evenly(clock):
+    pool = KeyPool(["a", "b", "c"])
+    leased = []
+    for _ in range(6):
+        key = pool.acquire()
+        leased.append(key)
+        pool.release(key)
+    assert sorted(leased) == ["a", "a", "b", "b", "c", "c"]
+
+
+def test_key_with_most_reported_quota_is_preferred(clock):
+    pool = KeyPool(["a", "b"])
+    pool.release("a", remaining=5)
+    pool.release("b", remaining=50)
+    assert pool.acquire() == "b"
+
+
+def test_rate_limited_key_cools_down(clock):
+    pool = KeyPool(["a", "b"])
+    pool.release(pool.acquire(), status=429)
+    assert pool.available() == 1
+    clock[0] += DEFAULT_RATE_LIMIT_COOLDOWN + 1
+    assert pool.available() == 2
+
+
+def test_retry_after_sets_cooldown(clock):
+    pool = KeyPool(["a"])
+    pool.release(pool.acquire(), status=429, retry_after=5)
+    clock[0] += 4
+    assert pool.available() == 0
+    clock[0] += 2
+    assert pool.available() == 1
+
+
+def test_cooldown_doubles_on_repeated_rate_limits(clock):
+    pool = KeyPool(["a"])
+    pool.release(pool.acquire(), status=429)
+    clock[0] += DEFAULT_RATE_LIMIT_COOLDOWN + 1
+    pool.release(pool.acquire(), status=429)
+    clock[0] += DEFAULT_RATE_LIMIT_COOLDOWN + 1
+    assert pool.available() == 0
+    clock[0] += DEFAULT_RATE_LIMIT_COOLDOWN
+    assert pool.available() == 1
+
+
+def test_rejected_key_is_left_out(clock):
+    pool = KeyPool(["a", "b"])
+    pool.release("a", status=401)
+    assert all(pool.acquire() == "b" for _ in range(3))
+    clock[0] += REJECTED_KEY_COOLDOWN + 1
+    assert pool.available() == 2
+
+
+def test_all_keys_cooling_down_uses_first_to_recover(clock):
+    pool = KeyPool(["a", "b"])
+    pool.release("a", status=429, retry_after=10)
+    pool.release("b", status=429, retry_after=5)
+    assert pool.acquire() == "b"
+
+
+def test_api_keys_from_environment(monkeypatch):
+    monkeypatch.setenv("FAKE_API_KEYS", "k1, k2,,k1")
+    monkeypatch.setenv("FAKE_API_KEY", "single")
+    assert api_keys("fake") == ["k1", "k2", "k1"]
+    assert len(get_key_pool("fake")) == 2
+    monkeypatch.delenv("FAKE_API_KEYS")
+    assert api_keys("fake") == ["single"]
+    monkeypatch.delenv("FAKE_API_KEY")
+    assert get_key_pool("fake") is None
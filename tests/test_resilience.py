@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+
+from open_deep_research import resilience
+from open_deep_research.key_pool import KeyPool
+from open_deep_research.resilience import CircuitBreaker, CircuitOpenError, SearchResilience, error_status, is_retryable, retry_after
+
+# No backoff between attempts, so retries run instantly
+FAST_POLICY = {"max_attempts": 3, "base_delay": 0.0, "max_delay": 0.0, "failure_threshold": 2, "reset_timeout": 30.0}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def http_error(status, headers=None):
+    request = httpx.Request("GET", "https://api.example.com/search")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+    assert breaker.before_request() == pytest.approx(30.0)
+
+
+def test_breaker_half_opens_and_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock[0] += 31
+    # One trial request is let through, the others wait for its verdict
+    assert breaker.before_request() == 0.0
+    assert breaker.before_request() > 0
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.before_request() == 0.0
+
+
+def test_breaker_reopens_when_trial_fails(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 31
+    assert breaker.before_request() == 0.0
+    assert breaker.record_failure()
+    assert breaker.before_request() == pytest.approx(30.0)
+
+
+def test_breaker_lets_another_trial_through_after_release(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock[0] += 31
+    assert breaker.before_request() == 0.0
+    breaker.release_trial()
+    assert breaker.before_request() == 0.0
+
+
+@pytest.mark.parametrize("status, retryable", [(429, True), (500, True), (503, True), (408, True), (400, False), (401, False), (404, False)])
+def test_http_status_classification(status, retryable):
+    error = http_error(status)
+    assert error_status(error) == status
+    assert is_retryable(error) is retryable
+
+
+def test_transport_errors_are_retryable():
+    assert is_retryable(httpx.ConnectError("connection refused"))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad query"))
+
+
+def test_status_from_message():
+    assert error_status(Exception("Request failed with status code: 502")) == 502
+    assert error_status(Exception("Too Many Requests")) == 429
+
+
+def test_retry_after_header():
+    assert retry_after(http_error(429, {"retry-after": "7"})) == 7.0
+    assert retry_after(http_error(429)) is None
+
+
+def test_call_retries_transient_failures():
+    search = SearchResilience({"fake": FAST_POLICY})
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise http_error(503)
+        return "ok"
+
+    assert asyncio.run(search.call("fake", request)) == "ok"
+    assert search.metrics()["fake"]["retries"] == 2
+    assert not search.get_breaker("fake").is_open
+
+
+def test_call_does_not_retry_client_errors():
+    search = SearchResilience({"fake": FAST_POLICY})
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        raise http_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(search.call("fake", request))
+    assert len(attempts) == 1
+    # The caller's mistake doesn't count against the provider
+    assert search.metrics()["fake"]["circuit_trips"] == 0
+
+
+def test_call_short_circuits_once_open():
+    search = SearchResilience({"fake": FAST_POLICY})
+
+    async def request():
+        raise http_error(500)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(search.call("fake", request))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(search.call("fake", request))
+    assert search.metrics()["fake"]["circuit_trips"] == 1
+    assert search.metrics()["fake"]["short_circuits"] == 1
+
+
+def test_call_rotates_rate_limited_key():
+    search = SearchResilience({"fake": {**FAST_POLICY, "max_attempts": 1}})
+    pool = KeyPool(["key-a", "key-b"])
+    used = []
+
+    async def request(api_key):
+        used.append(api_key)
+        if len(used) == 1:
+            raise http_error(429, {"retry-after": "60"})
+        return "ok"
+
+    assert asyncio.run(search.call("fake", request, key_pool=pool)) == "ok"
+    assert used[0] != used[1]
+    assert pool.available() == 1
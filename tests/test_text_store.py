@@ -0,0 +1,16 @@
+from open_deep_research.text_store import TextStore
+
+
+def test_round_trip(tmp_path):
+    store = TextStore(str(tmp_path))
+    digest = store.put("full page text")
+    assert store.get(digest) == "full page text"
+    assert store.get(digest, max_chars=4) == "full"
+
+
+def test_least_recently_used_texts_are_evicted(tmp_path):
+    store = TextStore(str(tmp_path), max_bytes=10_000)
+    digests = [store.put(f"{i} " + "x" * 3_000) for i in range(6)]
+    assert store.get(digests[0]) is None
+    assert store.get(digests[-1]).startswith("5 ")
+    assert sum(entry.stat().st_size for entry in store._files()) <= 10_000